@@ -6,7 +6,7 @@ from sqlmodel import SQLModel
 from alembic import context
 
 from app.core.config import get_settings
-from app.models.db import User, GameCache, UserGame  # noqa: F401
+from app.models.db import User, GameCache, GameFetchJob, UserGame, LibraryChange, LibraryDailyStats  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -1,15 +1,20 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from sqlmodel import Session
+from sqlalchemy import event
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
-from app.core.database import get_session
+from app.core.metrics import CallbackMetric
+from app.core.database import RoutingSession, get_read_session
 from app.models.db import User
+from app.models.schemas import AuthenticatedUser
 
 settings = get_settings()
 
@@ -17,41 +22,143 @@ security = HTTPBearer()
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+# bcrypt releases the GIL, so a small thread pool hashes in parallel while
+# keeping the event loop and the request threadpool free
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash",
+)
+_pending_hashes = 0
+
+# Principals of recently authenticated users, keyed by user id. Invalidation
+# is per process, so the TTL bounds staleness across workers.
+user_cache = TTLCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+
+
+# Verified token payloads keyed by a digest of the token, kept until "exp"
+token_cache = TTLCache(maxsize=settings.token_cache_size, ttl=0)
+
+
+def _auth_cache_lookups():
+    for name, cache in (("user", user_cache), ("token", token_cache)):
+        yield {"cache": name, "result": "hit"}, cache.hits
+        yield {"cache": name, "result": "miss"}, cache.misses
+
+
+CallbackMetric(
+    "auth_cache_lookups_total",
+    "Lookups in the authenticated-user and verified-token caches",
+    _auth_cache_lookups,
+    ["cache", "result"],
+    type="counter",
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.id)
+
+
+# bcrypt and python-jose (with its crypto backends) are imported on first
+# use rather than at module import, which keeps worker startup fast
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    import bcrypt
+
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    import bcrypt
+
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a bcrypt hash was made with a different cost than configured."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.bcrypt_rounds
+
+
+async def run_password_hash(func: Callable[..., T], *args) -> T:
+    """
+    Run a password hashing function in the dedicated worker pool.
+
+    Rejects the request with 503 once too many hashes are already queued,
+    so a login storm cannot build an unbounded backlog.
+    """
+    global _pending_hashes
+    if _pending_hashes >= settings.password_hash_max_pending:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _pending_hashes -= 1
+
+
 def create_access_token(user_id: int) -> str:
+    from jose import jwt
+
     expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     payload = {"sub": str(user_id), "exp": expire, "type": "access"}
     return jwt.encode(payload, settings.secret_key, algorithm=ALGORITHM)
 
 
 def create_refresh_token(user_id: int) -> str:
+    from jose import jwt
+
     expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
     payload = {"sub": str(user_id), "exp": expire, "type": "refresh"}
     return jwt.encode(payload, settings.secret_key, algorithm=ALGORITHM)
 
 
 def decode_token(token: str) -> dict:
+    """
+    Verify a JWT and return its payload.
+
+    Verified payloads are cached until the token expires, so repeated
+    requests with the same token skip the signature check.
+    """
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return dict(payload)
+
+    from jose import JWTError, jwt
+
     try:
-        return jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
 
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(digest, dict(payload), ttl=expires_in)
+    return payload
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session),
-) -> User:
+
+def _user_id_from_token(credentials: HTTPAuthorizationCredentials) -> int:
     payload = decode_token(credentials.credentials)
 
     if payload.get("type") != "access":
@@ -67,11 +174,43 @@ def get_current_user(
             detail="Invalid token payload",
         )
 
-    user = session.get(User, int(user_id))
+    return int(user_id)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: RoutingSession = Depends(get_read_session),
+) -> AuthenticatedUser:
+    """Resolve the authenticated user, checking the users table on cache misses."""
+    user_id = _user_id_from_token(credentials)
+
+    principal = user_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = session.get(User, user_id)
+    if not user and session.reads_from_replica():
+        # A just-registered user may not have reached the replica yet
+        session.use_primary()
+        user = session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
-    return user
+    principal = AuthenticatedUser(id=user.id, username=user.username, email=user.email)
+    user_cache.set(user_id, principal)
+    return principal
+
+
+def get_current_user_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> AuthenticatedUser:
+    """
+    Resolve the authenticated user from the token claims alone.
+
+    For routes that only need ``current_user.id``: no database lookup is
+    made, so a deleted user keeps access until their token expires.
+    """
+    return AuthenticatedUser(id=_user_id_from_token(credentials))
@@ -0,0 +1,98 @@
+"""
+Response compression.
+
+``CompressionMiddleware`` compresses JSON and text responses larger than
+COMPRESSION_MIN_BYTES. It uses brotli when the optional ``brotli`` package is
+installed and the client accepts it, and gzip otherwise. Only responses sent
+in a single body message are buffered. Streamed and file responses, such as
+cover images, pass through untouched.
+"""
+
+import gzip
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+settings = get_settings()
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+# Favour speed: these levels get most of the size reduction for JSON
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _accepted_encoding(scope) -> Optional[str]:
+    """Pick the best supported encoding from the Accept-Encoding header."""
+    for name, value in scope["headers"]:
+        if name != b"accept-encoding":
+            continue
+        accepted = set()
+        for item in value.decode("latin-1").lower().split(","):
+            coding, _, params = item.strip().partition(";")
+            if params.strip().replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(coding.strip())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large JSON and text responses."""
+
+    def __init__(self, app):
+        self.app = app
+        self.minimum_size = settings.compression_min_bytes
+
+    async def __call__(self, scope, receive, send):
+        encoding = _accepted_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                # Already decided to pass this response through
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            compressible = headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if (
+                compressible
+                and "content-encoding" not in headers
+                and not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+            ):
+                body = _compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
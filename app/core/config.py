@@ -6,18 +6,98 @@ class Settings(BaseSettings):
     # Application
     app_name: str = "Backlog Stats API"
     debug: bool = False
+    # "development" creates missing tables at startup; "production" leaves the
+    # schema to Alembic and only checks that the database is at its head
+    startup_mode: str = "development"
+    # Encode responses straight to JSON bytes instead of revalidating them
+    # against response_model
+    fast_serialization: bool = False
+    # gzip (or brotli, if installed) for JSON and text responses above this size
+    compression_enabled: bool = False
+    compression_min_bytes: int = 1024
+    # Requests slower than this are logged with a per-phase timing breakdown
+    slow_request_threshold_ms: int = 500
+    # GET /metrics is not mounted unless enabled; with a token set, scrapers
+    # must send "Authorization: Bearer <token>". In production mode it is
+    # only mounted when a token is set.
+    metrics_enabled: bool = True
+    metrics_token: str = ""
+
+    # Request profiling (the middleware is not installed unless enabled)
+    profiling_enabled: bool = False
+    # Requests with an "X-Profile: <token>" header are profiled
+    profiling_token: str = ""
+    # Also profile 1 in N requests; 0 disables sampling
+    profiling_sample_rate: int = 0
+    profiling_dir: str = "./profiles"
+    profiling_max_files: int = 100
 
     # Database
     database_url: str = "sqlite:///./backlogstats.db"
+    # "development" shares one SQLite connection; "production" uses a pool of
+    # WAL-mode connections with tuned pragmas (file databases only)
+    sqlite_mode: str = "development"
+    sqlite_pool_size: int = 8
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    # PostgreSQL connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle_seconds: int = 1800
+    db_pool_timeout_seconds: float = 30
+    # Optional read replica for read-only routes; empty sends everything to
+    # the primary. Clients who just wrote read from the primary for this long,
+    # tracked by a cookie so it holds whichever worker serves them.
+    database_replica_url: str = ""
+    replica_sticky_seconds: int = 5
+    # "async" adds uncached games with placeholder metadata and returns 202;
+    # a background queue then fetches the metadata from IGDB in batches
+    library_add_mode: str = "sync"
+    game_queue_batch_size: int = 20
+    game_queue_poll_seconds: float = 5
+    game_queue_max_attempts: int = 8
+    # Library change log entries older than this are compacted
+    library_change_retention_days: int = 30
 
     # IGDB API
     igdb_client_id: str = ""
     igdb_client_secret: str = ""
 
+    # Cover image proxy
+    cover_cache_dir: str = "./cover_cache"
+    cover_cache_max_bytes: int = 512 * 1024 * 1024
+    # When set (e.g. "http://localhost:8000"), cover URLs point at /covers
+    # on this host instead of hot-linking images.igdb.com
+    cover_proxy_base_url: str = ""
+
     # JWT Authentication
     secret_key: str = "change-me-in-production"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: int = 60
+    token_cache_size: int = 10000
+
+    # Rate limiting (token buckets per user, or per IP for anonymous routes)
+    rate_limit_enabled: bool = True
+    # Routes that call IGDB share its quota, so they get a smaller budget
+    rate_limit_igdb_burst: int = 20
+    rate_limit_igdb_per_minute: int = 60
+    rate_limit_local_burst: int = 60
+    rate_limit_local_per_minute: int = 600
+    # "module:ClassName" of a RateLimitBackend; empty uses in-memory buckets
+    rate_limit_backend: str = ""
+    # Reverse proxies in front of the app. 0 limits anonymous routes by the
+    # socket peer address, which behind a proxy puts every client in one
+    # bucket; N reads the client from the Nth-last X-Forwarded-For entry.
+    rate_limit_trusted_proxies: int = 0
+
+    # Password hashing
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    # Hashes queued beyond this are rejected with 503 instead of piling up
+    password_hash_max_pending: int = 64
 
     class Config:
         env_file = ".env"
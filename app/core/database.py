@@ -1,33 +1,255 @@
+import ast
+import re
+import time
+from pathlib import Path
+
+from fastapi import Request, Response
 from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import QueuePool, StaticPool
 from app.core.config import get_settings
+from app.core.metrics import CallbackMetric, db_pool_checkouts, db_pool_wait
+from app.core.timing import record_db
 
 settings = get_settings()
 
-# Configure engine based on database type
-if settings.database_url.startswith("sqlite"):
-    # SQLite configuration for development
-    engine = create_engine(
-        settings.database_url,
-        echo=settings.debug,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-else:
+ALEMBIC_VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+_REVISION_RE = re.compile(r"^(revision|down_revision)\b[^=\n]*=\s*(.+)$", re.MULTILINE)
+
+
+def _is_sqlite_memory(database_url: str) -> bool:
+    return database_url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in database_url
+
+
+def sqlite_pragmas() -> dict[str, object]:
+    """Pragmas applied to every connection in the production SQLite profile."""
+    return {
+        # Readers see a snapshot and don't block behind the writer
+        "journal_mode": "WAL",
+        # Safe with WAL: only the last transactions can be lost on power failure
+        "synchronous": "NORMAL",
+        # Negative values are KiB rather than pages
+        "cache_size": -settings.sqlite_cache_size_kib,
+        "mmap_size": settings.sqlite_mmap_size,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "temp_store": "MEMORY",
+    }
+
+
+def _apply_sqlite_pragmas(engine: Engine, pragmas: dict[str, object]) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - started)
+
+
+def create_app_engine(database_url: str, sqlite_mode: str = settings.sqlite_mode) -> Engine:
+    """Create an engine configured for the given database type and SQLite profile."""
+    if database_url.startswith("sqlite"):
+        if sqlite_mode == "production" and not _is_sqlite_memory(database_url):
+            # SQLite production profile: a pool of WAL-mode connections
+            engine = create_engine(
+                database_url,
+                echo=settings.debug,
+                connect_args={"check_same_thread": False},
+                poolclass=TimedQueuePool,
+                pool_size=settings.sqlite_pool_size,
+                max_overflow=0,
+                pool_timeout=settings.sqlite_busy_timeout_ms / 1000,
+            )
+            _apply_sqlite_pragmas(engine, sqlite_pragmas())
+            return engine
+
+        # SQLite configuration for development: one shared connection
+        return create_engine(
+            database_url,
+            echo=settings.debug,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+
     # PostgreSQL configuration for production
-    engine = create_engine(
-        settings.database_url,
+    return create_engine(
+        database_url,
         echo=settings.debug,
-        pool_size=5,
-        max_overflow=10,
+        poolclass=TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_timeout=settings.db_pool_timeout_seconds,
         pool_pre_ping=True,
     )
 
 
+engine = create_app_engine(settings.database_url)
+# Without a replica, reads simply use the primary engine
+replica_engine = (
+    create_app_engine(settings.database_replica_url)
+    if settings.database_replica_url
+    else engine
+)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Record pool checkouts and per-request query time.
+
+    Listeners are registered on the engine, so they carry over when
+    ``dispose()`` or an invalidation recreates the pool. Checkout wait time
+    is recorded by ``TimedQueuePool``.
+    """
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        db_pool_checkouts.inc()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        record_db(time.perf_counter() - conn.info["query_started_at"].pop())
+
+
+def _engines():
+    yield "primary", engine
+    if replica_engine is not engine:
+        yield "replica", replica_engine
+
+
+def _pool_stats():
+    for name, db_engine in _engines():
+        pool = db_engine.pool
+        for stat in ("size", "checkedout", "overflow"):
+            if hasattr(pool, stat):
+                yield {"engine": name, "stat": stat}, getattr(pool, stat)()
+
+
+for _name, _engine in _engines():
+    instrument_engine(_engine)
+CallbackMetric(
+    "db_pool_connections",
+    "SQLAlchemy pool size, checked out and overflow connections",
+    _pool_stats,
+    ["engine", "stat"],
+)
+
+
+# Set on responses to writes. The client sends it back, so whichever worker
+# serves its next requests reads from the primary until the replica caught up.
+PRIMARY_COOKIE = "read_primary_until"
+
+
+def mark_recent_write(response: Response) -> None:
+    """Route this client's reads to the primary for REPLICA_STICKY_SECONDS."""
+    if replica_engine is not engine:
+        until = int(time.time()) + settings.replica_sticky_seconds
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            str(until),
+            max_age=settings.replica_sticky_seconds,
+            httponly=True,
+            samesite="lax",
+        )
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the request carries an unexpired primary cookie."""
+    try:
+        until = int(request.cookies.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        return False
+    # Bounded so a hand-made cookie can't pin reads to the primary for long
+    now = time.time()
+    return now < until <= now + settings.replica_sticky_seconds + 1
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from the replica and writes to the primary.
+
+    The bind is chosen per statement: flushes always go to the primary, as
+    does everything once ``use_primary()`` has been called.
+    """
+
+    def use_primary(self) -> None:
+        self.info["use_primary"] = True
+
+    def reads_from_replica(self) -> bool:
+        return replica_engine is not engine and not self.info.get("use_primary")
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get("use_primary") or self._flushing:
+            return engine
+        return replica_engine
+
+
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 
+def alembic_heads(versions_dir: Path = ALEMBIC_VERSIONS_DIR) -> set[str]:
+    """Find the head revisions by reading the migration files, without importing Alembic."""
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        for name, value in _REVISION_RE.findall(path.read_text()):
+            value = ast.literal_eval(value.strip())
+            if name == "revision":
+                revisions.add(value)
+            elif isinstance(value, str):
+                parents.add(value)
+            elif value:
+                parents.update(value)
+    return revisions - parents
+
+
+def verify_schema_revision() -> None:
+    """Check with one query that the database has been migrated to the Alembic head."""
+    try:
+        with engine.connect() as connection:
+            current = set(
+                connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalars()
+            )
+    except DBAPIError:
+        current = set()
+
+    expected = alembic_heads()
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {', '.join(sorted(current)) or 'none'} "
+            f"but the code expects {', '.join(sorted(expected))}; run 'alembic upgrade head'"
+        )
+
+
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+def get_read_session(request: Request):
+    """
+    Session for read-only routes, served by the replica when configured.
+
+    Clients that wrote within REPLICA_STICKY_SECONDS read from the primary.
+    """
+    with RoutingSession() as session:
+        if wrote_recently(request):
+            session.use_primary()
+        yield session
@@ -0,0 +1,38 @@
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Response
+
+# Clients may keep responses but must revalidate them with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the values that determine a representation."""
+    digest = hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def fields_key(fields: Optional[Iterable[str]]) -> str:
+    """ETag part for a ``fields`` selection; None means every field."""
+    return "*" if fields is None else ",".join(sorted(fields))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -0,0 +1,23 @@
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, status
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[set[str]]:
+    """
+    Parse a comma-separated ``fields`` query parameter.
+
+    Returns None when no projection was requested, so callers can keep
+    their default field set.
+    """
+    if fields is None:
+        return None
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return requested
@@ -0,0 +1,29 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+_client: Optional["httpx.AsyncClient"] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Return the process-wide HTTP client, creating it on first use.
+
+    Sharing one client keeps upstream connections (IGDB, Twitch, image CDN)
+    alive between requests instead of reconnecting on every call.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        # Imported on first use to keep it out of worker startup
+        import httpx
+
+        _client = httpx.AsyncClient()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
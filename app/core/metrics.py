@@ -0,0 +1,239 @@
+"""
+Minimal Prometheus-style metrics.
+
+Metrics are kept in process memory and rendered in the text exposition
+format by ``render()``. Each metric takes a lock only to update a single
+dict entry, which keeps instrumentation cheap enough to leave on.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list["_Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last one is +Inf), sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class CallbackMetric(_Metric):
+    """A gauge or counter whose values are read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], Iterable[tuple[dict, float]]],
+        labelnames: Iterable[str] = (),
+        type: str = "gauge",
+    ):
+        super().__init__(name, help, labelnames)
+        self.type = type
+        self.callback = callback
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, self._key(labels))} {value}"
+            for labels, value in self.callback()
+        ]
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; label by its
+            # template so path parameters don't explode label cardinality
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status_code,
+            )
+
+
+def render(metrics: Optional[Iterable[_Metric]] = None) -> str:
+    """Render all registered metrics in the Prometheus text format."""
+    return "\n".join(metric.render() for metric in (metrics or _registry)) + "\n"
+
+
+# Application metrics
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+
+igdb_requests = Counter(
+    "igdb_requests_total",
+    "Requests made to the IGDB and Twitch APIs",
+    ["endpoint", "status"],
+)
+igdb_request_duration = Histogram(
+    "igdb_request_duration_seconds",
+    "Latency of requests made to the IGDB and Twitch APIs",
+    ["endpoint"],
+)
+igdb_token_refreshes = Counter(
+    "igdb_token_refreshes_total",
+    "Twitch OAuth access tokens fetched for IGDB",
+)
+
+db_pool_checkouts = Counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the SQLAlchemy pool",
+)
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the SQLAlchemy pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+
+game_queue_jobs = Counter(
+    "game_queue_jobs_total",
+    "Game metadata fetch jobs processed by the game queue",
+    ["result"],
+)
+
+game_cache_lookups = Counter(
+    "game_cache_lookups_total",
+    "GameCache lookups in LibraryService.get_or_cache_game",
+    ["result"],
+)
@@ -0,0 +1,90 @@
+"""
+On-demand request profiling.
+
+``ProfilingMiddleware`` is only installed when PROFILING_ENABLED is set, so
+there is no overhead otherwise. A request is profiled when it carries an
+``X-Profile`` header matching PROFILING_TOKEN, or when it is picked by the
+1-in-N sampler. Profiles are written as cProfile ``.prof`` files, which
+load in ``pstats``, snakeviz or gprof2dot, and only the newest files are kept.
+
+cProfile traces the event loop thread: concurrent requests on the same loop
+show up in the profile, and sync endpoints running in the threadpool do not.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import itertools
+import re
+import time
+from pathlib import Path
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _prune(directory: Path, keep: int) -> None:
+    profiles = sorted(directory.glob("*.prof"), key=lambda path: path.stat().st_mtime)
+    for path in profiles[:-keep] if keep > 0 else profiles:
+        path.unlink(missing_ok=True)
+
+
+def _write_profile(profiler: cProfile.Profile, path: Path, keep: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(path)
+    _prune(path.parent, keep)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requested or sampled requests with cProfile."""
+
+    def __init__(self, app):
+        self.app = app
+        self.directory = Path(settings.profiling_dir)
+        self._counter = itertools.count(1)
+        # cProfile can only trace one request at a time per thread
+        self._active = False
+
+    def _should_profile(self, scope) -> bool:
+        if settings.profiling_token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(
+                        value, settings.profiling_token.encode("latin-1")
+                    )
+        rate = settings.profiling_sample_rate
+        return rate > 0 and next(self._counter) % rate == 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        millis = time.time_ns() // 1_000_000 % 1000
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}.{millis:03d}-{scope['method']}-{slug}.prof"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", filename.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        self._active = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active = False
+            await asyncio.to_thread(
+                _write_profile,
+                profiler,
+                self.directory / filename,
+                settings.profiling_max_files,
+            )
@@ -0,0 +1,141 @@
+import importlib
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, NamedTuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.core.auth import get_current_user_claims
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.models.schemas import AuthenticatedUser
+
+settings = get_settings()
+
+# Route classes: "igdb" routes spend the shared IGDB quota, "local" routes
+# only touch our own database
+IGDB = "igdb"
+LOCAL = "local"
+
+
+class Budget(NamedTuple):
+    capacity: int
+    refill_per_second: float
+
+
+BUDGETS = {
+    IGDB: Budget(
+        settings.rate_limit_igdb_burst,
+        settings.rate_limit_igdb_per_minute / 60,
+    ),
+    LOCAL: Budget(
+        settings.rate_limit_local_burst,
+        settings.rate_limit_local_per_minute / 60,
+    ),
+}
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets.
+
+    Subclass and point RATE_LIMIT_BACKEND at it (``module:ClassName``) to
+    share buckets between workers, e.g. in Redis.
+    """
+
+    @abstractmethod
+    def take(self, key: str, budget: Budget) -> float:
+        """
+        Take one token from the bucket for ``key``.
+
+        Returns 0 if the request is allowed, otherwise the number of seconds
+        until a token becomes available.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process token buckets. Idle buckets expire once they would be full."""
+
+    def __init__(self, maxsize: int = 100_000):
+        self._buckets = TTLCache(maxsize=maxsize, ttl=0)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, budget: Budget) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (budget.capacity, now))
+            tokens = min(
+                budget.capacity, tokens + (now - updated_at) * budget.refill_per_second
+            )
+            if tokens < 1:
+                return (1 - tokens) / budget.refill_per_second
+
+            tokens -= 1
+            time_to_full = (budget.capacity - tokens) / budget.refill_per_second
+            self._buckets.set(key, (tokens, now), ttl=time_to_full)
+            return 0
+
+
+def _load_backend(path: str) -> RateLimitBackend:
+    if not path:
+        return InMemoryRateLimitBackend()
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+backend = _load_backend(settings.rate_limit_backend)
+
+
+def check_rate_limit(key: str, route_class: str) -> None:
+    """Raise 429 with Retry-After if ``key`` has exhausted its budget."""
+    if not settings.rate_limit_enabled:
+        return
+
+    retry_after = backend.take(f"{route_class}:{key}", BUDGETS[route_class])
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    """
+    Return the client address used for per-IP limits.
+
+    Behind RATE_LIMIT_TRUSTED_PROXIES reverse proxies, the address is read
+    from X-Forwarded-For, counting that many entries from the right. Entries
+    further left come from the client and can be forged.
+    """
+    hops = settings.rate_limit_trusted_proxies
+    if hops > 0:
+        forwarded = [
+            address.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for address in header.split(",")
+            if address.strip()
+        ]
+        if forwarded:
+            return forwarded[-min(hops, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_user(route_class: str) -> Callable:
+    """Dependency limiting authenticated routes per user id."""
+
+    def dependency(current_user: AuthenticatedUser = Depends(get_current_user_claims)):
+        check_rate_limit(f"user:{current_user.id}", route_class)
+
+    return dependency
+
+
+def limit_by_ip(route_class: str) -> Callable:
+    """Dependency limiting anonymous routes per client IP."""
+
+    def dependency(request: Request):
+        check_rate_limit(f"ip:{client_ip(request)}", route_class)
+
+    return dependency
@@ -0,0 +1,154 @@
+"""
+Per-request phase timing.
+
+``TimingMiddleware`` puts a ``RequestTimings`` accumulator in a context
+variable for each request. Database and IGDB instrumentation add to it,
+``TimedRoute`` marks when the endpoint returned so the remaining time until
+the response starts is attributed to serialization. The totals are sent in a
+``Server-Timing`` header, and slow requests are logged as one JSON line.
+"""
+
+import dataclasses
+import functools
+import inspect
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger("app.slow_requests")
+
+
+class RequestTimings:
+    __slots__ = (
+        "started_at",
+        "db_time",
+        "db_count",
+        "igdb_time",
+        "igdb_count",
+        "endpoint_done_at",
+        "serialize_time",
+    )
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.db_time = 0.0
+        self.db_count = 0
+        self.igdb_time = 0.0
+        self.igdb_count = 0
+        self.endpoint_done_at: Optional[float] = None
+        self.serialize_time = 0.0
+
+    def server_timing(self, total: float) -> str:
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"',
+            f'igdb;dur={self.igdb_time * 1000:.1f};desc="{self.igdb_count} calls"',
+            f"serialize;dur={self.serialize_time * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_db(elapsed: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.db_time += elapsed
+        timings.db_count += 1
+
+
+def record_igdb(elapsed: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.igdb_time += elapsed
+        timings.igdb_count += 1
+
+
+def _mark_endpoint_done() -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_done_at = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records when its endpoint returns."""
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_call(*args, **kwargs):
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    _mark_endpoint_done()
+        else:
+            @functools.wraps(call)
+            def timed_call(*args, **kwargs):
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    _mark_endpoint_done()
+
+        self.dependant = dataclasses.replace(self.dependant, call=timed_call)
+        return super().get_route_handler()
+
+
+class TimingMiddleware:
+    """ASGI middleware adding Server-Timing headers and logging slow requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                now = time.perf_counter()
+                if timings.endpoint_done_at is not None:
+                    timings.serialize_time = now - timings.endpoint_done_at
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    timings.server_timing(now - timings.started_at).encode("latin-1"),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - timings.started_at
+            if total * 1000 >= settings.slow_request_threshold_ms:
+                route = scope.get("route")
+                logger.warning(json.dumps({
+                    "event": "slow_request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": status_code,
+                    "total_ms": round(total * 1000, 1),
+                    "db_ms": round(timings.db_time * 1000, 1),
+                    "db_queries": timings.db_count,
+                    "igdb_ms": round(timings.igdb_time * 1000, 1),
+                    "igdb_calls": timings.igdb_count,
+                    "serialize_ms": round(timings.serialize_time * 1000, 1),
+                }))
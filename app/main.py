@@ -1,24 +1,49 @@
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-from app.routers import auth, games, library
-from app.core.database import create_db_and_tables
+from app.routers import auth, covers, games, library, metrics
+from app.core.compression import CompressionMiddleware
+from app.core.config import get_settings
+from app.core.database import create_db_and_tables, verify_schema_revision
+from app.core.http import close_http_client
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.timing import TimingMiddleware
+from app.services.game_queue_service import game_queue_service
 
 load_dotenv()
 
+settings = get_settings()
+
+logger = logging.getLogger("app")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Create database tables on startup (for development)
-    # In production, use Alembic migrations instead
-    create_db_and_tables()
+    if settings.startup_mode == "production":
+        # Alembic owns the schema; fail fast if migrations haven't been run
+        verify_schema_revision()
+    else:
+        # Create database tables on startup (for development)
+        create_db_and_tables()
+    if settings.library_add_mode == "async":
+        game_queue_service.start()
     yield
+    await game_queue_service.stop()
+    await close_http_client()
 
 
 app = FastAPI(title="Backlog Stats API", version="0.1.0", lifespan=lifespan)
 
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TimingMiddleware)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -28,11 +53,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "Retry-After", "ETag"],
 )
 
 app.include_router(auth.router)
 app.include_router(games.router)
+app.include_router(covers.router)
 app.include_router(library.router)
+if settings.metrics_enabled:
+    if settings.metrics_token or settings.startup_mode != "production":
+        app.include_router(metrics.router)
+    else:
+        # Route latencies and pool statistics are not for the public
+        logger.warning("METRICS_TOKEN is not set, so /metrics is not mounted in production")
 
 
 @app.get("/")
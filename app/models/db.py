@@ -1,6 +1,6 @@
-from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint, Index
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 
 
 class User(SQLModel, table=True):
@@ -12,6 +12,13 @@ class User(SQLModel, table=True):
     username: str = Field(unique=True, index=True, max_length=50)
     email: str = Field(unique=True, index=True, max_length=255)
     hashed_password: str
+    # Bumped whenever the user's library changes; used for library ETags
+    library_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Highest library change sequence dropped by compaction; older sync
+    # tokens can no longer be served incrementally
+    changes_compacted_through: int = Field(
+        default=0, sa_column_kwargs={"server_default": "0"}
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -30,12 +37,32 @@ class GameCache(SQLModel, table=True):
     summary: Optional[str] = None
     cover_url: Optional[str] = None
     release_date: Optional[datetime] = None
+    # "pending" while a placeholder waits for the game queue to fetch it from
+    # IGDB; "not_found" or "failed" if that never succeeded
+    metadata_status: str = Field(
+        default="ready", max_length=20, sa_column_kwargs={"server_default": "ready"}
+    )
     cached_at: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationships
     user_games: list["UserGame"] = Relationship(back_populates="game")
 
 
+class GameFetchJob(SQLModel, table=True):
+    """Queued IGDB metadata fetch for a placeholder GameCache entry."""
+
+    __tablename__ = "game_fetch_jobs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    igdb_id: int = Field(unique=True, index=True)
+    attempts: int = 0
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    # Set by the worker that claimed the job, so workers never share a batch
+    claim_token: Optional[str] = Field(default=None, max_length=32, index=True)
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class UserGame(SQLModel, table=True):
     """Join table linking users to their game library with platform info."""
 
@@ -45,6 +72,8 @@ class UserGame(SQLModel, table=True):
             "user_id", "igdb_id", "platform_igdb_id",
             name="uq_user_game_platform",
         ),
+        # Change log entries refer to ids of deleted rows, so never reuse them
+        {"sqlite_autoincrement": True},
     )
 
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -58,3 +87,51 @@ class UserGame(SQLModel, table=True):
     # Relationships
     user: Optional[User] = Relationship(back_populates="library_games")
     game: Optional[GameCache] = Relationship(back_populates="user_games")
+
+
+class LibraryChange(SQLModel, table=True):
+    """Append-only log of library adds and removals, used for delta sync."""
+
+    __tablename__ = "library_changes"
+    __table_args__ = (
+        Index("ix_library_changes_user_id_id", "user_id", "id"),
+        Index(
+            "ix_library_changes_user_game_key",
+            "user_id", "igdb_id", "platform_igdb_id",
+        ),
+        # Ids are sync tokens and must keep increasing after compaction
+        {"sqlite_autoincrement": True},
+    )
+
+    # Monotonic sequence number, also the client's sync token
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    action: str = Field(max_length=10)
+    # Not a foreign key: the entry outlives the removed user_games row
+    user_game_id: int
+    igdb_id: int
+    platform_igdb_id: int
+    # Set on adds logged again because the game's metadata was fetched; the
+    # stats rollup counts only the other adds
+    metadata_refresh: bool = Field(default=False, sa_column_kwargs={"server_default": "0"})
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LibraryDailyStats(SQLModel, table=True):
+    """Per-user, per-platform library adds and removals for one UTC day."""
+
+    __tablename__ = "library_daily_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "day", "platform_igdb_id",
+            name="uq_library_daily_stats_user_day_platform",
+        ),
+        Index("ix_library_daily_stats_user_id_day", "user_id", "day"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    day: date
+    platform_igdb_id: int
+    added: int = 0
+    removed: int = 0
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import Literal, Optional
+from datetime import date, datetime
 
 
 # Auth schemas
@@ -36,6 +36,14 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class AuthenticatedUser(BaseModel):
+    """Lightweight principal for the user behind an access token."""
+
+    id: int
+    username: Optional[str] = None
+    email: Optional[str] = None
+
+
 # Library schemas
 class LibraryGameAdd(BaseModel):
     igdb_id: int
@@ -53,6 +61,8 @@ class LibraryGameResponse(BaseModel):
     platform_igdb_id: int
     platform_name: str
     added_at: datetime
+    # "pending" until game details have been fetched from IGDB
+    metadata_status: str = "ready"
 
     class Config:
         from_attributes = True
@@ -63,3 +73,36 @@ class LibraryGameListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+
+
+class LibraryChangeResponse(BaseModel):
+    seq: int
+    action: Literal["add", "remove"]
+    igdb_id: int
+    platform_igdb_id: int
+    changed_at: datetime
+    # The library entry for adds that have not been removed since
+    game: Optional[LibraryGameResponse] = None
+
+
+class LibraryChangesResponse(BaseModel):
+    changes: list[LibraryChangeResponse]
+    # Pass as `since` on the next sync
+    sync_token: str
+    has_more: bool
+
+
+class LibraryStatsBucket(BaseModel):
+    period_start: date
+    platform_igdb_id: int
+    added: int
+    removed: int
+    # Games on this platform in the collection at the end of the period
+    total: int
+
+
+class LibraryStatsHistoryResponse(BaseModel):
+    granularity: Literal["day", "week", "month"]
+    start: date
+    end: date
+    buckets: list[LibraryStatsBucket]
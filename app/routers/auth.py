@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 
-from app.core.database import get_session
+from app.core.database import get_session, mark_recent_write
+from app.core.rate_limit import LOCAL, limit_by_ip
+from app.core.timing import TimedRoute
 from app.core.auth import (
     hash_password,
     verify_password,
+    password_needs_rehash,
+    run_password_hash,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -17,41 +25,73 @@ from app.models.schemas import (
     RefreshTokenRequest,
 )
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(
+    prefix="/auth",
+    tags=["auth"],
+    dependencies=[Depends(limit_by_ip(LOCAL))],
+    route_class=TimedRoute,
+)
 
 
-@router.post("/register", response_model=TokenResponse, status_code=201)
-def register(data: UserRegister, session: Session = Depends(get_session)):
-    """Register a new user account."""
-    # Check if username already exists
+def _registration_conflict(session: Session, data: UserRegister) -> Optional[str]:
+    """Return why the username or email can't be registered, if either is taken."""
     existing = session.exec(
         select(User).where(User.username == data.username)
     ).first()
     if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Username already taken",
-        )
+        return "Username already taken"
 
-    # Check if email already exists
     existing = session.exec(
         select(User).where(User.email == data.email)
     ).first()
     if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Email already registered",
-        )
+        return "Email already registered"
+    return None
+
 
-    # Create user
+def _create_user(session: Session, data: UserRegister, hashed_password: str) -> User:
     user = User(
         username=data.username,
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=hashed_password,
     )
     session.add(user)
     session.commit()
     session.refresh(user)
+    return user
+
+
+def _get_user_by_username(session: Session, username: str) -> Optional[User]:
+    return session.exec(select(User).where(User.username == username)).first()
+
+
+def _update_password_hash(session: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    user.updated_at = datetime.utcnow()
+    session.add(user)
+    session.commit()
+
+
+# The routes are async so they can await the password hash pool; their
+# database calls run in the threadpool to keep the event loop free, as they
+# would in a sync route.
+
+
+@router.post("/register", response_model=TokenResponse, status_code=201)
+async def register(
+    data: UserRegister,
+    response: Response,
+    session: Session = Depends(get_session),
+):
+    """Register a new user account."""
+    conflict = await run_in_threadpool(_registration_conflict, session, data)
+    if conflict:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict)
+
+    hashed_password = await run_password_hash(hash_password, data.password)
+    user = await run_in_threadpool(_create_user, session, data, hashed_password)
+    # The new account may not have reached the replica yet
+    mark_recent_write(response)
 
     return TokenResponse(
         access_token=create_access_token(user.id),
@@ -60,18 +100,23 @@ def register(data: UserRegister, session: Session = Depends(get_session)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: UserLogin, session: Session = Depends(get_session)):
+async def login(data: UserLogin, session: Session = Depends(get_session)):
     """Authenticate and receive JWT tokens."""
-    user = session.exec(
-        select(User).where(User.username == data.username)
-    ).first()
+    user = await run_in_threadpool(_get_user_by_username, session, data.username)
 
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await run_password_hash(
+        verify_password, data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
 
+    # Upgrade the stored hash when the configured bcrypt cost has changed
+    if password_needs_rehash(user.hashed_password):
+        hashed_password = await run_password_hash(hash_password, data.password)
+        await run_in_threadpool(_update_password_hash, session, user, hashed_password)
+
     return TokenResponse(
         access_token=create_access_token(user.id),
         refresh_token=create_refresh_token(user.id),
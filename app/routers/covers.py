@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Path, Request, Response
+from fastapi.responses import FileResponse
+
+from app.core.etag import etag_matches
+from app.core.timing import TimedRoute
+from app.services.cover_service import CoverNotFoundError, cover_service
+
+router = APIRouter(prefix="/covers", tags=["covers"], route_class=TimedRoute)
+
+# Cover images never change for a given image_id and size
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{image_id}/{size}")
+async def get_cover(
+    request: Request,
+    image_id: str = Path(..., description="The IGDB image ID"),
+    size: str = Path(..., description="IGDB image size, e.g. cover_big, 720p, 1080p"),
+):
+    """
+    Serve an IGDB cover image through the local disk cache.
+
+    Images are downloaded from IGDB on first request only.
+    """
+    if not cover_service.is_valid(image_id, size):
+        raise HTTPException(status_code=404, detail="Cover not found")
+
+    headers = {"ETag": f'"{image_id}-{size}"', "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path = await cover_service.get_cover_path(image_id, size)
+    except CoverNotFoundError:
+        raise HTTPException(status_code=404, detail="Cover not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching cover: {str(e)}")
+
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
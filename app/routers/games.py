@@ -1,43 +1,139 @@
-from fastapi import APIRouter, Query, HTTPException, Path
-from app.services.igdb_service import igdb_service
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, HTTPException, Path, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.config import get_settings
+from app.core.etag import CACHE_CONTROL, etag_matches, fields_key, make_etag, not_modified
+from app.core.fields import parse_fields
+from app.core.rate_limit import IGDB, limit_by_ip
+from app.core.serialization import dump_response
+from app.core.timing import TimedRoute
+from app.services.igdb_service import igdb_service, GAME_FIELD_PATHS, REQUIRED_GAME_FIELDS
 from app.models.game import Game
 
-router = APIRouter(prefix="/games", tags=["games"])
+router = APIRouter(
+    prefix="/games",
+    tags=["games"],
+    dependencies=[Depends(limit_by_ip(IGDB))],
+    route_class=TimedRoute,
+)
+
+settings = get_settings()
+
+GAME_FIELDS = set(GAME_FIELD_PATHS) | REQUIRED_GAME_FIELDS
+
+# Prebuilt for the fast serialization path
+GAME_ADAPTER = TypeAdapter(Game)
+GAME_LIST_ADAPTER = TypeAdapter(list[Game])
+
+
+def _project(game: dict, fields: set[str]) -> dict:
+    """Validate an IGDB game and keep only the requested top-level keys."""
+    return Game.model_validate(game).model_dump(
+        mode="json", include=fields | REQUIRED_GAME_FIELDS
+    )
 
 
 @router.get("/search", response_model=list[Game])
 async def search_games(
+    response: Response,
     q: str = Query(..., description="Search query for game name", min_length=1),
     limit: int = Query(10, description="Maximum number of results", ge=1, le=50),
+    offset: int = Query(0, description="Number of results to skip", ge=0),
+    platform: Optional[list[int]] = Query(
+        None, description="Only games on any of these IGDB platform IDs"
+    ),
+    genre: Optional[list[int]] = Query(
+        None, description="Only games in any of these IGDB genre IDs"
+    ),
+    year_from: Optional[int] = Query(
+        None, description="Only games first released in or after this year", ge=1950, le=2100
+    ),
+    year_to: Optional[int] = Query(
+        None, description="Only games first released in or before this year", ge=1950, le=2100
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated list of game fields to return"
+    ),
 ):
     """
     Search for games by name using the IGDB API.
 
     Returns a list of games with their name, platforms, release dates, and cover images.
+    Results can be filtered by platform, genre and release year; the total number
+    of matches is returned in the `X-Total-Count` header.
+    Use `fields` to narrow both the IGDB query and the response payload.
     """
+    requested = parse_fields(fields, GAME_FIELDS)
+    if year_from is not None and year_to is not None and year_from > year_to:
+        raise HTTPException(status_code=400, detail="year_from must not be after year_to")
+
     try:
-        results = await igdb_service.search_games(query=q, limit=limit)
-        return results
+        results, total = await igdb_service.search_games_with_count(
+            query=q,
+            limit=limit,
+            offset=offset,
+            fields=requested,
+            platform_ids=platform,
+            genre_ids=genre,
+            year_from=year_from,
+            year_to=year_to,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching games: {str(e)}")
 
+    headers = {"X-Total-Count": str(total)}
+    if settings.fast_serialization:
+        include = None if requested is None else {"__all__": requested | REQUIRED_GAME_FIELDS}
+        return dump_response(GAME_LIST_ADAPTER, results, headers, include=include)
+    if requested is None:
+        response.headers.update(headers)
+        return results
+    return JSONResponse([_project(game, requested) for game in results], headers=headers)
+
 
 @router.get("/{game_id}", response_model=Game)
 async def get_game(
+    request: Request,
+    response: Response,
     game_id: int = Path(..., description="The IGDB game ID", gt=0),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated list of game fields to return"
+    ),
 ):
     """
     Get detailed information for a specific game by ID.
 
     Returns comprehensive game data including summary, genres, developers,
     publishers, screenshots, videos, and ratings.
+    Use `fields` to narrow both the IGDB query and the response payload.
+    Responses carry an `ETag` of their content; send it in `If-None-Match`
+    to get an empty `304 Not Modified` while the game is unchanged.
     """
+    requested = parse_fields(fields, GAME_FIELDS)
+
     try:
-        game = await igdb_service.get_game_by_id(game_id=game_id)
+        game = await igdb_service.get_game_by_id(game_id=game_id, fields=requested)
         if not game:
             raise HTTPException(status_code=404, detail=f"Game with ID {game_id} not found")
-        return game
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching game details: {str(e)}")
+
+    # The body is fetched live from IGDB, so the ETag is taken from its content
+    etag = make_etag("game", game_id, fields_key(requested), json.dumps(game, sort_keys=True))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if settings.fast_serialization:
+        include = None if requested is None else requested | REQUIRED_GAME_FIELDS
+        return dump_response(GAME_ADAPTER, game, headers, include=include)
+    if requested is None:
+        response.headers.update(headers)
+        return game
+    return JSONResponse(_project(game, requested), headers=headers)
@@ -1,29 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from datetime import date, datetime
+from typing import Iterable, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
 from sqlmodel import Session
 
-from app.core.database import get_session
-from app.core.auth import get_current_user
-from app.models.db import User
-from app.services.library_service import library_service
+from app.core.config import get_settings
+from app.core.database import get_read_session, get_session, mark_recent_write
+from app.core.auth import get_current_user, get_current_user_claims
+from app.core.etag import CACHE_CONTROL, etag_matches, fields_key, make_etag, not_modified
+from app.core.fields import parse_fields
+from app.core.rate_limit import IGDB, LOCAL, limit_by_user
+from app.core.serialization import encode_response
+from app.core.timing import TimedRoute
+from app.models.db import UserGame
+from app.services.game_queue_service import game_queue_service
+from app.services.library_service import library_service, OPTIONAL_GAME_COLUMNS
+from app.services.stats_service import period_start, stats_service
 from app.models.schemas import (
+    AuthenticatedUser,
     LibraryGameAdd,
     LibraryGameResponse,
     LibraryGameListResponse,
+    LibraryChangeResponse,
+    LibraryChangesResponse,
+    LibraryStatsHistoryResponse,
 )
 
-router = APIRouter(prefix="/library", tags=["library"])
+router = APIRouter(prefix="/library", tags=["library"], route_class=TimedRoute)
+
+settings = get_settings()
+
+LIBRARY_GAME_FIELDS = set(LibraryGameResponse.model_fields)
+
+# Longest date range served per granularity, to bound the response size
+MAX_HISTORY_DAYS = {"day": 2 * 366, "week": 10 * 366, "month": 50 * 366}
+
+
+def _to_data(user_game: UserGame, fields: Optional[Iterable[str]] = None) -> dict:
+    """
+    Build the LibraryGameResponse fields of a library entry, in model order.
+
+    Optional GameCache fields not listed in ``fields`` are left out so they
+    are dropped from the payload (routes use response_model_exclude_unset).
+    """
+    game_cache = user_game.game
+    data = {
+        "id": user_game.id,
+        "igdb_id": user_game.igdb_id,
+        "name": game_cache.name,
+    }
+    for field in OPTIONAL_GAME_COLUMNS:
+        if fields is None or field in fields:
+            data[field] = getattr(game_cache, field)
+    data["platform_igdb_id"] = user_game.platform_igdb_id
+    data["platform_name"] = user_game.platform_name
+    data["added_at"] = user_game.added_at
+    data["metadata_status"] = game_cache.metadata_status
+    return data
+
+
+def _to_response(
+    user_game: UserGame, fields: Optional[Iterable[str]] = None
+) -> LibraryGameResponse:
+    """Build a LibraryGameResponse from a library entry."""
+    return LibraryGameResponse(**_to_data(user_game, fields))
 
 
-@router.post("/games", response_model=LibraryGameResponse, status_code=201)
+@router.post(
+    "/games",
+    response_model=LibraryGameResponse,
+    status_code=201,
+    dependencies=[Depends(limit_by_user(IGDB))],
+)
 async def add_game_to_library(
     game: LibraryGameAdd,
+    response: Response,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
 ):
     """
     Add a game to your collection for a specific platform.
 
     The same game can be added for different platforms.
+    When the server runs in async add mode, a game that isn't cached yet is
+    added right away with `metadata_status: "pending"` and a `202`; its
+    details are filled in from IGDB in the background.
     """
     try:
         user_game = await library_service.add_game_to_library(
@@ -32,107 +93,252 @@ async def add_game_to_library(
             igdb_id=game.igdb_id,
             platform_igdb_id=game.platform_igdb_id,
             platform_name=game.platform_name,
+            defer_metadata=settings.library_add_mode == "async",
         )
-        game_cache = user_game.game
-        return LibraryGameResponse(
-            id=user_game.id,
-            igdb_id=user_game.igdb_id,
-            name=game_cache.name,
-            summary=game_cache.summary,
-            cover_url=game_cache.cover_url,
-            release_date=game_cache.release_date,
-            platform_igdb_id=user_game.platform_igdb_id,
-            platform_name=user_game.platform_name,
-            added_at=user_game.added_at,
-        )
+        mark_recent_write(response)
+        if user_game.game.metadata_status == "pending":
+            response.status_code = 202
+            game_queue_service.wake()
+        return _to_response(user_game)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding game: {str(e)}")
 
 
-@router.get("/games", response_model=LibraryGameListResponse)
+@router.get(
+    "/games",
+    response_model=LibraryGameListResponse,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(limit_by_user(LOCAL))],
+)
 async def list_library_games(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated list of game fields to return"
+    ),
+    session: Session = Depends(get_read_session),
+    current_user: AuthenticatedUser = Depends(get_current_user_claims),
 ):
     """
     List all games in your collection with pagination.
+
+    Use `fields` to skip loading and returning large columns such as `summary`.
+    Send the returned `ETag` in `If-None-Match` to get `304 Not Modified`
+    while the collection is unchanged.
     """
+    requested = parse_fields(fields, LIBRARY_GAME_FIELDS)
+    version = library_service.get_library_version(session, current_user.id)
+    etag = make_etag(
+        "library", current_user.id, version, page, page_size, fields_key(requested)
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
     user_games, total = library_service.get_library_games(
         session=session,
         user_id=current_user.id,
         page=page,
         page_size=page_size,
+        game_fields=requested,
     )
 
-    games = []
-    for user_game in user_games:
-        game_cache = user_game.game
-        games.append(
-            LibraryGameResponse(
-                id=user_game.id,
-                igdb_id=user_game.igdb_id,
-                name=game_cache.name,
-                summary=game_cache.summary,
-                cover_url=game_cache.cover_url,
-                release_date=game_cache.release_date,
-                platform_igdb_id=user_game.platform_igdb_id,
-                platform_name=user_game.platform_name,
-                added_at=user_game.added_at,
-            )
-        )
-
+    if settings.fast_serialization:
+        return encode_response({
+            "games": [_to_data(user_game, requested) for user_game in user_games],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        }, headers)
+    response.headers.update(headers)
     return LibraryGameListResponse(
-        games=games,
+        games=[_to_response(user_game, requested) for user_game in user_games],
         total=total,
         page=page,
         page_size=page_size,
     )
 
 
-@router.get("/games/{igdb_id}", response_model=list[LibraryGameResponse])
+@router.get(
+    "/changes",
+    response_model=LibraryChangesResponse,
+    dependencies=[Depends(limit_by_user(LOCAL))],
+)
+async def get_library_changes(
+    since: int = Query(0, ge=0, description="Sync token from the previous sync"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of changes"),
+    session: Session = Depends(get_read_session),
+    current_user: AuthenticatedUser = Depends(get_current_user_claims),
+):
+    """
+    List adds and removals in your collection since the last sync.
+
+    Start with `since=0`, which replays the whole collection as adds, then pass
+    the returned `sync_token` on each sync. Repeat while `has_more` is true.
+    A `410` means the token predates compacted history: sync again from 0.
+    """
+    try:
+        changes, entries, has_more = library_service.get_library_changes(
+            session=session,
+            user_id=current_user.id,
+            since=since,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=410, detail=f"{e}, sync again with since=0")
+
+    sync_token = str(changes[-1].id if changes else since)
+    if settings.fast_serialization:
+        return encode_response({
+            "changes": [
+                {
+                    "seq": change.id,
+                    "action": change.action,
+                    "igdb_id": change.igdb_id,
+                    "platform_igdb_id": change.platform_igdb_id,
+                    "changed_at": change.changed_at,
+                    "game": (
+                        _to_data(entries[change.user_game_id])
+                        if change.action == "add" and change.user_game_id in entries
+                        else None
+                    ),
+                }
+                for change in changes
+            ],
+            "sync_token": sync_token,
+            "has_more": has_more,
+        })
+
+    return LibraryChangesResponse(
+        changes=[
+            LibraryChangeResponse(
+                seq=change.id,
+                action=change.action,
+                igdb_id=change.igdb_id,
+                platform_igdb_id=change.platform_igdb_id,
+                changed_at=change.changed_at,
+                game=(
+                    _to_response(entries[change.user_game_id])
+                    if change.action == "add" and change.user_game_id in entries
+                    else None
+                ),
+            )
+            for change in changes
+        ],
+        sync_token=sync_token,
+        has_more=has_more,
+    )
+
+
+@router.get(
+    "/stats/history",
+    response_model=LibraryStatsHistoryResponse,
+    dependencies=[Depends(limit_by_user(LOCAL))],
+)
+async def get_library_stats_history(
+    start: date = Query(..., description="First day of the range (UTC)"),
+    end: Optional[date] = Query(None, description="Last day of the range (UTC), default today"),
+    granularity: Literal["day", "week", "month"] = Query(
+        "day", description="Bucket size"
+    ),
+    platform: Optional[list[int]] = Query(
+        None, description="Only these IGDB platform IDs"
+    ),
+    session: Session = Depends(get_read_session),
+    current_user: AuthenticatedUser = Depends(get_current_user_claims),
+):
+    """
+    Chart how your collection grew over time.
+
+    Returns games added and removed per platform for each day, week or month
+    in the range, with the running total of games on that platform.
+    Weeks start on Monday; the range is widened to whole periods.
+    """
+    end = end or datetime.utcnow().date()
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days > MAX_HISTORY_DAYS[granularity]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too long for {granularity} granularity "
+            f"(max {MAX_HISTORY_DAYS[granularity]} days)",
+        )
+
+    buckets = stats_service.get_history(
+        session=session,
+        user_id=current_user.id,
+        start=start,
+        end=end,
+        granularity=granularity,
+        platform_ids=platform,
+    )
+    return LibraryStatsHistoryResponse(
+        granularity=granularity,
+        start=period_start(start, granularity),
+        end=end,
+        buckets=buckets,
+    )
+
+
+@router.get(
+    "/games/{igdb_id}",
+    response_model=list[LibraryGameResponse],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(limit_by_user(LOCAL))],
+)
 async def get_library_game(
+    request: Request,
+    response: Response,
     igdb_id: int = Path(..., description="IGDB game ID", gt=0),
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated list of game fields to return"
+    ),
+    session: Session = Depends(get_read_session),
+    current_user: AuthenticatedUser = Depends(get_current_user_claims),
 ):
     """
     Get all entries for a specific game in your collection (one per platform).
     """
+    requested = parse_fields(fields, LIBRARY_GAME_FIELDS)
+    version = library_service.get_library_version(session, current_user.id)
+    etag = make_etag(
+        "library_game", current_user.id, version, igdb_id, fields_key(requested)
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
     user_games = library_service.get_library_games_by_igdb_id(
         session=session,
         user_id=current_user.id,
         igdb_id=igdb_id,
+        game_fields=requested,
     )
 
     if not user_games:
         raise HTTPException(status_code=404, detail="Game not found in collection")
 
-    return [
-        LibraryGameResponse(
-            id=ug.id,
-            igdb_id=ug.igdb_id,
-            name=ug.game.name,
-            summary=ug.game.summary,
-            cover_url=ug.game.cover_url,
-            release_date=ug.game.release_date,
-            platform_igdb_id=ug.platform_igdb_id,
-            platform_name=ug.platform_name,
-            added_at=ug.added_at,
-        )
-        for ug in user_games
-    ]
+    if settings.fast_serialization:
+        return encode_response([_to_data(ug, requested) for ug in user_games], headers)
+    response.headers.update(headers)
+    return [_to_response(ug, requested) for ug in user_games]
 
 
-@router.delete("/games/{igdb_id}/platforms/{platform_igdb_id}", status_code=204)
+@router.delete(
+    "/games/{igdb_id}/platforms/{platform_igdb_id}",
+    status_code=204,
+    dependencies=[Depends(limit_by_user(LOCAL))],
+)
 async def remove_game_from_library(
+    response: Response,
     igdb_id: int = Path(..., description="IGDB game ID", gt=0),
     platform_igdb_id: int = Path(..., description="IGDB platform ID", gt=0),
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user_claims),
 ):
     """
     Remove a specific game+platform entry from your collection.
@@ -147,4 +353,5 @@ async def remove_game_from_library(
     if not removed:
         raise HTTPException(status_code=404, detail="Game not found in collection")
 
+    mark_recent_write(response)
     return None
@@ -0,0 +1,30 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.timing import TimedRoute
+
+settings = get_settings()
+
+router = APIRouter(tags=["metrics"], route_class=TimedRoute)
+
+
+def require_metrics_token(authorization: str = Header(default="")) -> None:
+    """Require ``Authorization: Bearer <METRICS_TOKEN>`` when a token is configured."""
+    if not settings.metrics_token:
+        return
+    expected = f"Bearer {settings.metrics_token}"
+    if not hmac.compare_digest(authorization.encode("utf-8"), expected.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+def get_metrics():
+    """Expose application metrics in the Prometheus text format."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.http import get_http_client
+from app.services.igdb_service import IGDB_IMAGE_URL
+
+# IGDB image size presets that may be proxied
+ALLOWED_SIZES = {"thumb", "cover_small", "cover_big", "720p", "1080p"}
+
+_IMAGE_ID_RE = re.compile(r"^[A-Za-z0-9]+$")
+
+# Eviction frees space down to this fraction of the budget, so the directory
+# is rescanned only once per that much downloading
+LOW_WATER_MARK = 0.9
+# Files used this recently are never evicted: a response may be about to open them
+EVICTION_GRACE_SECONDS = 60
+# Rescan at least this often to count other workers' downloads
+RESCAN_SECONDS = 300
+
+
+class CoverNotFoundError(Exception):
+    """IGDB has no image for the requested ID and size."""
+
+
+class CoverService:
+    """
+    Fetches IGDB cover images once and keeps them in a size-bounded on-disk
+    LRU cache.
+
+    The LRU order is the files' modification times, which hits touch, so it
+    is shared by all workers and survives restarts. Each process keeps a
+    running byte total from its last scan of the directory plus its own
+    downloads; the directory is rescanned, and the least recently used files
+    evicted, only when that total exceeds the budget or every RESCAN_SECONDS
+    to pick up other workers' downloads.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self._inflight: dict[Path, asyncio.Future] = {}
+
+    @staticmethod
+    def is_valid(image_id: str, size: str) -> bool:
+        return size in ALLOWED_SIZES and bool(_IMAGE_ID_RE.match(image_id))
+
+    def _path(self, image_id: str, size: str) -> Path:
+        return self.cache_dir / size / f"{image_id}.jpg"
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        """Mark a cached file as recently used. Returns False if it is gone."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        """Write a file atomically so readers never see a partial image."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Per-process temporary name, so workers fetching the same image don't collide
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+
+    def _evict(self) -> None:
+        """Rescan the cache and delete least recently used files until under the low-water mark."""
+        files = []
+        for path in self.cache_dir.glob("*/*.jpg"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Evicted by another worker during the scan
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+
+        total_bytes = sum(size for _, _, size in files)
+        if total_bytes > self.max_bytes:
+            target = self.max_bytes * LOW_WATER_MARK
+            protected_since = time.time() - EVICTION_GRACE_SECONDS
+            for mtime, path, size in sorted(files):
+                if total_bytes <= target or mtime >= protected_since:
+                    break
+                path.unlink(missing_ok=True)
+                total_bytes -= size
+
+        self._total_bytes = total_bytes
+        self._scanned_at = time.monotonic()
+
+    def _record(self, size: int) -> None:
+        """Count a downloaded file, evicting when the cache is over budget."""
+        with self._lock:
+            if (
+                self._total_bytes is None
+                or time.monotonic() - self._scanned_at > RESCAN_SECONDS
+            ):
+                self._evict()
+                return
+            self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    async def _fetch(self, image_id: str, size: str, path: Path) -> None:
+        client = get_http_client()
+        response = await client.get(IGDB_IMAGE_URL.format(size=size, image_id=image_id))
+        if response.status_code == 404:
+            raise CoverNotFoundError(image_id)
+        response.raise_for_status()
+        await asyncio.to_thread(self._write, path, response.content)
+        await asyncio.to_thread(self._record, len(response.content))
+
+    async def get_cover_path(self, image_id: str, size: str) -> Path:
+        """
+        Return the local path of a cover image, downloading it on a miss.
+
+        A hit touches the file, and recently touched files are never evicted,
+        so the file stays in place while the response opens it. A file that
+        was evicted before the touch is downloaded again. Concurrent misses
+        for the same image share a single download.
+        """
+        path = self._path(image_id, size)
+        if self._touch(path):
+            return path
+
+        inflight = self._inflight.get(path)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch(image_id, size, path))
+            self._inflight[path] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(path, None))
+
+        await asyncio.shield(inflight)
+        return path
+
+
+settings = get_settings()
+
+# Singleton instance
+cover_service = CoverService(settings.cover_cache_dir, settings.cover_cache_max_bytes)
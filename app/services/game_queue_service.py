@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.core.database import engine
+from app.core.metrics import game_queue_jobs
+from app.models.db import GameCache, GameFetchJob
+from app.services.igdb_service import igdb_service
+from app.services.library_service import (
+    GAME_CACHE_FIELDS,
+    game_cache_values,
+    library_service,
+)
+
+logger = logging.getLogger("app.game_queue")
+
+# How long a claimed batch is reserved before another worker may retry it
+CLAIM_LEASE = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff between attempts: 30s, 1m, 2m, ... capped at an hour."""
+    return min(timedelta(seconds=15 * 2 ** attempts), MAX_RETRY_DELAY)
+
+
+class GameQueueService:
+    """
+    Fills pending GameCache placeholders from IGDB in the background.
+
+    Jobs live in the ``game_fetch_jobs`` table, so they survive restarts and
+    can be shared by several workers: each batch is claimed with a token
+    before it is fetched.
+    """
+
+    def __init__(self, batch_size: int, poll_seconds: float, max_attempts: int):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def wake(self) -> None:
+        """Process the queue now instead of at the next poll."""
+        self._wakeup.set()
+
+    def _claim_batch(self, session: Session) -> list[GameFetchJob]:
+        now = datetime.utcnow()
+        due = session.exec(
+            select(GameFetchJob.id)
+            .where(GameFetchJob.next_attempt_at <= now)
+            .order_by(GameFetchJob.next_attempt_at)
+            .limit(self.batch_size)
+        ).all()
+        if not due:
+            return []
+
+        token = uuid.uuid4().hex
+        # Jobs another worker claimed meanwhile no longer match next_attempt_at
+        session.exec(
+            update(GameFetchJob)
+            .where(GameFetchJob.id.in_(due), GameFetchJob.next_attempt_at <= now)
+            .values(
+                claim_token=token,
+                next_attempt_at=now + CLAIM_LEASE,
+                attempts=GameFetchJob.attempts + 1,
+            )
+        )
+        session.commit()
+        return list(session.exec(select(GameFetchJob).where(GameFetchJob.claim_token == token)))
+
+    def _set_status(self, session: Session, igdb_ids: list[int], status: str) -> list[GameCache]:
+        games = list(session.exec(select(GameCache).where(GameCache.igdb_id.in_(igdb_ids))))
+        for game_cache in games:
+            game_cache.metadata_status = status
+            game_cache.cached_at = datetime.utcnow()
+            session.add(game_cache)
+        return games
+
+    async def process_batch(self) -> int:
+        """Fetch one batch of due jobs from IGDB. Returns the number of jobs claimed."""
+        with Session(engine) as session:
+            jobs = self._claim_batch(session)
+            if not jobs:
+                return 0
+
+            try:
+                igdb_games = await igdb_service.get_games_by_ids(
+                    [job.igdb_id for job in jobs], GAME_CACHE_FIELDS
+                )
+            except Exception as e:
+                logger.warning("Game metadata fetch failed for %d jobs: %s", len(jobs), e)
+                failed = []
+                for job in jobs:
+                    if job.attempts >= self.max_attempts:
+                        failed.append(job.igdb_id)
+                        session.delete(job)
+                        game_queue_jobs.inc(result="failed")
+                    else:
+                        job.claim_token = None
+                        job.last_error = str(e)[:500]
+                        job.next_attempt_at = datetime.utcnow() + retry_delay(job.attempts)
+                        session.add(job)
+                        game_queue_jobs.inc(result="retry")
+                if failed:
+                    games = self._set_status(session, failed, "failed")
+                    library_service.record_game_metadata_changes(
+                        session, [game.id for game in games]
+                    )
+                session.commit()
+                return len(jobs)
+
+            by_id = {game["id"]: game for game in igdb_games}
+            games = list(session.exec(
+                select(GameCache).where(GameCache.igdb_id.in_([job.igdb_id for job in jobs]))
+            ))
+            for game_cache in games:
+                igdb_game = by_id.get(game_cache.igdb_id)
+                if igdb_game:
+                    for column, value in game_cache_values(igdb_game).items():
+                        setattr(game_cache, column, value)
+                    game_cache.metadata_status = "ready"
+                else:
+                    game_cache.metadata_status = "not_found"
+                game_cache.cached_at = datetime.utcnow()
+                session.add(game_cache)
+                game_queue_jobs.inc(result=game_cache.metadata_status)
+            for job in jobs:
+                session.delete(job)
+            library_service.record_game_metadata_changes(session, [game.id for game in games])
+            session.commit()
+            return len(jobs)
+
+    async def run(self) -> None:
+        """Process the queue until cancelled."""
+        while True:
+            # Cleared before processing so a wake() during the batch isn't lost
+            self._wakeup.clear()
+            try:
+                claimed = await self.process_batch()
+            except Exception:
+                logger.exception("Game queue batch failed")
+                claimed = 0
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+settings = get_settings()
+
+# Singleton instance
+game_queue_service = GameQueueService(
+    batch_size=settings.game_queue_batch_size,
+    poll_seconds=settings.game_queue_poll_seconds,
+    max_attempts=settings.game_queue_max_attempts,
+)
@@ -1,7 +1,160 @@
-import httpx
 import os
-from typing import Optional
-from datetime import datetime, timedelta
+import time
+from typing import TYPE_CHECKING, Iterable, Optional
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import get_settings
+from app.core.http import get_http_client
+from app.core.metrics import igdb_request_duration, igdb_requests, igdb_token_refreshes
+from app.core.timing import record_igdb
+
+if TYPE_CHECKING:
+    import httpx
+
+IGDB_IMAGE_URL = "https://images.igdb.com/igdb/image/upload/t_{size}/{image_id}.jpg"
+
+# Image sizes exposed as cover URLs on game payloads
+COVER_SIZES = {
+    "url_1080p": "1080p",
+    "url_720p": "720p",
+    "url_cover_big": "cover_big",
+}
+
+
+# APIcalypse field paths backing each top-level key of the Game model.
+# ``id`` is always returned by IGDB and is not listed here.
+GAME_FIELD_PATHS: dict[str, list[str]] = {
+    "name": ["name"],
+    "platforms": ["platforms.name"],
+    "release_dates": [
+        "release_dates.date",
+        "release_dates.human",
+        "release_dates.platform.name",
+    ],
+    "cover": ["cover.image_id"],
+    "summary": ["summary"],
+    "storyline": ["storyline"],
+    "genres": ["genres.name"],
+    "involved_companies": [
+        "involved_companies.company.name",
+        "involved_companies.developer",
+        "involved_companies.publisher",
+    ],
+    "rating": ["rating"],
+    "aggregated_rating": ["aggregated_rating"],
+}
+
+# Fields that are always requested because the Game model requires them
+REQUIRED_GAME_FIELDS = {"id", "name"}
+
+SEARCH_FIELDS = ["name", "platforms", "release_dates", "cover"]
+DETAIL_FIELDS = list(GAME_FIELD_PATHS)
+
+
+def build_fields_clause(fields: Iterable[str]) -> str:
+    """Build an APIcalypse ``fields`` clause for the given Game keys."""
+    paths = []
+    for field in ["name", *fields]:
+        for path in GAME_FIELD_PATHS.get(field, []):
+            if path not in paths:
+                paths.append(path)
+    return f"fields {', '.join(paths)};"
+
+
+def cover_url(image_id: str, size: str) -> str:
+    """URL for a cover image, served through the local proxy when configured."""
+    proxy_base_url = get_settings().cover_proxy_base_url
+    if proxy_base_url:
+        return f"{proxy_base_url.rstrip('/')}/covers/{image_id}/{size}"
+    return IGDB_IMAGE_URL.format(size=size, image_id=image_id)
+
+
+def _year_start(year: int) -> int:
+    """Unix timestamp for January 1st of ``year`` (UTC)."""
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+class IGDBQuery:
+    """
+    Builder for APIcalypse query bodies.
+
+    Each method returns the builder so clauses can be chained:
+
+        IGDBQuery().search("zelda").where_in("platforms", [130]).limit(10).build()
+    """
+
+    def __init__(self):
+        self._search: Optional[str] = None
+        self._fields: Optional[str] = None
+        self._conditions: list[str] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+
+    def search(self, term: str) -> "IGDBQuery":
+        escaped = term.replace("\\", "\\\\").replace('"', '\\"')
+        self._search = f'search "{escaped}";'
+        return self
+
+    def fields(self, fields: Iterable[str]) -> "IGDBQuery":
+        self._fields = build_fields_clause(fields)
+        return self
+
+    def where(self, condition: str) -> "IGDBQuery":
+        self._conditions.append(condition)
+        return self
+
+    def where_in(self, field: str, values: Optional[Iterable[int]]) -> "IGDBQuery":
+        """Match games where ``field`` contains any of ``values``."""
+        if values:
+            self.where(f"{field} = ({','.join(str(int(v)) for v in values)})")
+        return self
+
+    def where_years(
+        self, year_from: Optional[int] = None, year_to: Optional[int] = None
+    ) -> "IGDBQuery":
+        """Restrict ``first_release_date`` to an inclusive range of years."""
+        if year_from is not None:
+            self.where(f"first_release_date >= {_year_start(year_from)}")
+        if year_to is not None:
+            self.where(f"first_release_date < {_year_start(year_to + 1)}")
+        return self
+
+    def limit(self, limit: int) -> "IGDBQuery":
+        self._limit = limit
+        return self
+
+    def offset(self, offset: int) -> "IGDBQuery":
+        self._offset = offset
+        return self
+
+    def build(self) -> str:
+        clauses = []
+        if self._search:
+            clauses.append(self._search)
+        if self._fields:
+            clauses.append(self._fields)
+        if self._conditions:
+            clauses.append(f"where {' & '.join(self._conditions)};")
+        if self._limit is not None:
+            clauses.append(f"limit {self._limit};")
+        if self._offset:
+            clauses.append(f"offset {self._offset};")
+        return "\n".join(clauses)
+
+    def filters(self) -> "IGDBQuery":
+        """Copy of this query's search and where clauses, without fields or paging."""
+        copied = IGDBQuery()
+        copied._search = self._search
+        copied._conditions = list(self._conditions)
+        return copied
+
+
+def build_multiquery(queries: list[tuple[str, str, IGDBQuery]]) -> str:
+    """Combine ``(endpoint, name, query)`` triples into a ``/multiquery`` body."""
+    return "\n".join(
+        f'query {endpoint} "{name}" {{\n{query.build()}\n}};'
+        for endpoint, name, query in queries
+    )
 
 
 class IGDBService:
@@ -10,8 +163,23 @@ class IGDBService:
         self.client_secret = os.getenv("IGDB_CLIENT_SECRET")
         self.access_token: Optional[str] = None
         self.token_expires_at: Optional[datetime] = None
-        self.base_url = "https://api.igdb.com/v4"
-        self.auth_url = "https://id.twitch.tv/oauth2/token"
+        self.base_url = os.getenv("IGDB_BASE_URL", "https://api.igdb.com/v4")
+        self.auth_url = os.getenv("TWITCH_AUTH_URL", "https://id.twitch.tv/oauth2/token")
+
+    async def _post(self, endpoint: str, url: str, **kwargs) -> "httpx.Response":
+        """POST through the shared client, recording call count, status and latency."""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await get_http_client().post(url, **kwargs)
+            status = response.status_code
+            response.raise_for_status()
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            igdb_requests.inc(endpoint=endpoint, status=status)
+            igdb_request_duration.observe(elapsed, endpoint=endpoint)
+            record_igdb(elapsed)
 
     async def _get_access_token(self) -> str:
         """Get OAuth2 access token from Twitch."""
@@ -19,116 +187,171 @@ class IGDBService:
             if datetime.now() < self.token_expires_at:
                 return self.access_token
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.auth_url,
-                params={
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                    "grant_type": "client_credentials",
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            self.access_token = data["access_token"]
-            expires_in = data.get("expires_in", 3600)
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
-            return self.access_token
+        response = await self._post(
+            "oauth2/token",
+            self.auth_url,
+            params={
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "grant_type": "client_credentials",
+            },
+        )
+        igdb_token_refreshes.inc()
+        data = response.json()
+        self.access_token = data["access_token"]
+        expires_in = data.get("expires_in", 3600)
+        self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
+        return self.access_token
+
+    async def _headers(self) -> dict:
+        token = await self._get_access_token()
+        return {
+            "Client-ID": self.client_id,
+            "Authorization": f"Bearer {token}",
+        }
 
-    async def search_games(self, query: str, limit: int = 10) -> list[dict]:
+    async def search_games_with_count(
+        self,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        fields: Optional[Iterable[str]] = None,
+        platform_ids: Optional[list[int]] = None,
+        genre_ids: Optional[list[int]] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+    ) -> tuple[list[dict], int]:
         """
-        Search for games by name.
+        Search for games with filters and return one page plus the total count.
+
+        Both are fetched in a single ``/multiquery`` round trip.
 
         Args:
             query: Search query string
             limit: Maximum number of results to return
+            offset: Number of results to skip
+            fields: Game keys to request (defaults to SEARCH_FIELDS)
+            platform_ids: Only games released on any of these IGDB platforms
+            genre_ids: Only games in any of these IGDB genres
+            year_from: Only games first released in or after this year
+            year_to: Only games first released in or before this year
 
         Returns:
-            List of game dictionaries with id, name, platforms, release dates, and cover image
+            Tuple of (list of game dictionaries, total number of matches)
         """
-        token = await self._get_access_token()
+        headers = await self._headers()
 
-        headers = {
-            "Client-ID": self.client_id,
-            "Authorization": f"Bearer {token}",
-        }
+        filtered = (
+            IGDBQuery()
+            .search(query)
+            .where_in("platforms", platform_ids)
+            .where_in("genres", genre_ids)
+            .where_years(year_from, year_to)
+        )
+        page = (
+            filtered.filters()
+            .fields(fields if fields is not None else SEARCH_FIELDS)
+            .limit(limit)
+            .offset(offset)
+        )
+        body = build_multiquery([
+            ("games", "results", page),
+            ("games/count", "total", filtered),
+        ])
 
-        # IGDB uses a specific query language
-        # We're requesting: name, platforms (with names), release_dates (with human-readable format), and cover image
-        body = f"""
-        search "{query}";
-        fields name, platforms.name, release_dates.date, release_dates.human, release_dates.platform.name, cover.image_id;
-        limit {limit};
-        """
+        response = await self._post(
+            "multiquery",
+            f"{self.base_url}/multiquery",
+            headers=headers,
+            data=body,
+        )
+        sections = {section["name"]: section for section in response.json()}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/games",
-                headers=headers,
-                data=body,
-            )
-            response.raise_for_status()
-            results = response.json()
+        results = sections.get("results", {}).get("result", [])
+        total = sections.get("total", {}).get("count", len(results))
+
+        for game in results:
+            self._add_cover_urls(game)
+
+        return results, total
+
+    async def get_games_by_ids(
+        self, game_ids: Iterable[int], fields: Optional[Iterable[str]] = None
+    ) -> list[dict]:
+        """
+        Get several games by ID in a single request.
 
-            # Process results to add cover URLs in multiple sizes
-            for game in results:
-                if "cover" in game and "image_id" in game["cover"]:
-                    image_id = game["cover"]["image_id"]
-                    # Construct URLs for different sizes
-                    game["cover"]["url_1080p"] = f"https://images.igdb.com/igdb/image/upload/t_1080p/{image_id}.jpg"
-                    game["cover"]["url_720p"] = f"https://images.igdb.com/igdb/image/upload/t_720p/{image_id}.jpg"
-                    game["cover"]["url_cover_big"] = f"https://images.igdb.com/igdb/image/upload/t_cover_big/{image_id}.jpg"
+        Games IGDB doesn't know are missing from the result.
+        """
+        game_ids = list(game_ids)
+        headers = await self._headers()
+        body = (
+            IGDBQuery()
+            .fields(fields if fields is not None else DETAIL_FIELDS)
+            .where_in("id", game_ids)
+            .limit(len(game_ids))
+            .build()
+        )
 
-            return results
+        response = await self._post(
+            "games",
+            f"{self.base_url}/games",
+            headers=headers,
+            data=body,
+        )
+        games = response.json()
+        for game in games:
+            self._add_cover_urls(game)
+        return games
 
-    async def get_game_by_id(self, game_id: int) -> dict:
+    async def get_game_by_id(
+        self, game_id: int, fields: Optional[Iterable[str]] = None
+    ) -> dict:
         """
         Get detailed information for a specific game by ID.
 
         Args:
             game_id: The IGDB game ID
+            fields: Game keys to request (defaults to DETAIL_FIELDS)
 
         Returns:
             Game dictionary with detailed information including summary, genres, companies, screenshots, etc.
         """
-        token = await self._get_access_token()
+        headers = await self._headers()
 
-        headers = {
-            "Client-ID": self.client_id,
-            "Authorization": f"Bearer {token}",
-        }
+        # Request comprehensive game data unless narrowed by the caller
+        body = (
+            IGDBQuery()
+            .fields(fields if fields is not None else DETAIL_FIELDS)
+            .where(f"id = {game_id}")
+            .build()
+        )
 
-        # Request comprehensive game data
-        body = f"""
-        fields name, summary, storyline, platforms.name, release_dates.date, release_dates.human,
-               release_dates.platform.name, cover.image_id, genres.name, involved_companies.company.name,
-               involved_companies.developer, involved_companies.publisher,
-               rating, aggregated_rating;
-        where id = {game_id};
-        """
+        response = await self._post(
+            "games",
+            f"{self.base_url}/games",
+            headers=headers,
+            data=body,
+        )
+        results = response.json()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/games",
-                headers=headers,
-                data=body,
-            )
-            response.raise_for_status()
-            results = response.json()
+        if not results:
+            return None
 
-            if not results:
-                return None
+        game = results[0]
 
-            game = results[0]
+        # Process cover URLs
+        self._add_cover_urls(game)
 
-            # Process cover URLs
-            if "cover" in game and "image_id" in game["cover"]:
-                image_id = game["cover"]["image_id"]
-                game["cover"]["url_1080p"] = f"https://images.igdb.com/igdb/image/upload/t_1080p/{image_id}.jpg"
-                game["cover"]["url_720p"] = f"https://images.igdb.com/igdb/image/upload/t_720p/{image_id}.jpg"
-                game["cover"]["url_cover_big"] = f"https://images.igdb.com/igdb/image/upload/t_cover_big/{image_id}.jpg"
+        return game
 
-            return game
+    @staticmethod
+    def _add_cover_urls(game: dict) -> None:
+        """Add cover URLs in multiple sizes to a game dictionary."""
+        if "cover" in game and "image_id" in game["cover"]:
+            image_id = game["cover"]["image_id"]
+            for key, size in COVER_SIZES.items():
+                game["cover"][key] = cover_url(image_id, size)
 
 
 # Create a singleton instance
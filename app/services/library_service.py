@@ -1,47 +1,145 @@
 from sqlmodel import Session, select
+from sqlalchemy import delete, func, update
+from sqlalchemy.orm import aliased, joinedload
 from datetime import datetime
+from typing import Iterable, Optional
 
-from app.models.db import GameCache, UserGame
+from app.core.metrics import game_cache_lookups
+from app.models.db import GameCache, GameFetchJob, LibraryChange, User, UserGame
 from app.services.igdb_service import igdb_service
+from app.services.stats_service import stats_service
+
+# Game keys needed to fill a GameCache entry from IGDB ("name" is implied)
+GAME_CACHE_FIELDS = ["summary", "release_dates", "cover"]
+
+# GameCache columns that library listings can skip loading on request
+OPTIONAL_GAME_COLUMNS = {
+    "summary": GameCache.summary,
+    "cover_url": GameCache.cover_url,
+    "release_date": GameCache.release_date,
+}
+
+
+def _game_load_options(game_fields: Optional[Iterable[str]]):
+    """Eager-load the cached game, limited to the requested columns."""
+    columns = OPTIONAL_GAME_COLUMNS.values()
+    if game_fields is not None:
+        columns = [
+            column
+            for field, column in OPTIONAL_GAME_COLUMNS.items()
+            if field in game_fields
+        ]
+    return joinedload(UserGame.game).load_only(
+        GameCache.igdb_id, GameCache.name, GameCache.metadata_status, *columns
+    )
+
+
+def game_cache_values(igdb_game: dict) -> dict:
+    """GameCache column values for a game fetched from IGDB."""
+    # Parse release date
+    release_date = None
+    if igdb_game.get("release_dates"):
+        first_release = igdb_game["release_dates"][0]
+        if first_release.get("date"):
+            release_date = datetime.fromtimestamp(first_release["date"])
+
+    # Get cover URL
+    cover_url = None
+    if igdb_game.get("cover"):
+        cover_url = igdb_game["cover"].get("url_720p")
+
+    return {
+        "name": igdb_game["name"],
+        "summary": igdb_game.get("summary"),
+        "cover_url": cover_url,
+        "release_date": release_date,
+    }
 
 
 class LibraryService:
+    def get_library_version(self, session: Session, user_id: int) -> int:
+        """Get the version counter bumped by every change to the user's library."""
+        statement = select(User.library_version).where(User.id == user_id)
+        return session.exec(statement).first() or 0
+
+    def _bump_library_version(self, session: Session, user_id: int) -> None:
+        # Incremented in SQL so concurrent changes never reuse a version
+        session.exec(
+            update(User)
+            .where(User.id == user_id)
+            .values(library_version=User.library_version + 1)
+        )
+
+    def _record_change(
+        self,
+        session: Session,
+        user_game: UserGame,
+        action: str,
+        metadata_refresh: bool = False,
+    ) -> None:
+        """
+        Bump the library version and append to the change log.
+
+        The version update locks the user's row until commit, so one user's
+        change log entries are numbered in commit order.
+        """
+        self._bump_library_version(session, user_game.user_id)
+        session.add(
+            LibraryChange(
+                user_id=user_game.user_id,
+                action=action,
+                user_game_id=user_game.id,
+                igdb_id=user_game.igdb_id,
+                platform_igdb_id=user_game.platform_igdb_id,
+                metadata_refresh=metadata_refresh,
+            )
+        )
+
     async def get_or_cache_game(self, session: Session, igdb_id: int) -> GameCache:
         """Get game from cache or fetch from IGDB and cache it."""
         statement = select(GameCache).where(GameCache.igdb_id == igdb_id)
         cached_game = session.exec(statement).first()
 
         if cached_game:
+            game_cache_lookups.inc(result="hit")
             return cached_game
+        game_cache_lookups.inc(result="miss")
 
         # Fetch from IGDB
         igdb_game = await igdb_service.get_game_by_id(igdb_id)
         if not igdb_game:
             raise ValueError(f"Game with IGDB ID {igdb_id} not found")
 
-        # Parse release date
-        release_date = None
-        if igdb_game.get("release_dates"):
-            first_release = igdb_game["release_dates"][0]
-            if first_release.get("date"):
-                release_date = datetime.fromtimestamp(first_release["date"])
+        # Create cache entry
+        game_cache = GameCache(igdb_id=igdb_id, **game_cache_values(igdb_game))
+        session.add(game_cache)
+        session.commit()
+        session.refresh(game_cache)
+        return game_cache
 
-        # Get cover URL
-        cover_url = None
-        if igdb_game.get("cover"):
-            cover_url = igdb_game["cover"].get("url_720p")
+    def get_or_queue_game(self, session: Session, igdb_id: int) -> GameCache:
+        """
+        Get game from cache, or add a pending placeholder and queue its fetch.
+
+        The placeholder and job are flushed but not committed, so they are
+        saved together with the caller's library entry.
+        """
+        statement = select(GameCache).where(GameCache.igdb_id == igdb_id)
+        cached_game = session.exec(statement).first()
+
+        if cached_game:
+            game_cache_lookups.inc(result="hit")
+            return cached_game
+        game_cache_lookups.inc(result="miss")
 
-        # Create cache entry
         game_cache = GameCache(
             igdb_id=igdb_id,
-            name=igdb_game["name"],
-            summary=igdb_game.get("summary"),
-            cover_url=cover_url,
-            release_date=release_date,
+            name=f"IGDB game {igdb_id}",
+            metadata_status="pending",
         )
         session.add(game_cache)
-        session.commit()
-        session.refresh(game_cache)
+        session.add(GameFetchJob(igdb_id=igdb_id))
+        session.flush()
         return game_cache
 
     async def add_game_to_library(
@@ -51,8 +149,14 @@ class LibraryService:
         igdb_id: int,
         platform_igdb_id: int,
         platform_name: str,
+        defer_metadata: bool = False,
     ) -> UserGame:
-        """Add a game to user's collection for a specific platform."""
+        """
+        Add a game to user's collection for a specific platform.
+
+        With ``defer_metadata``, an uncached game is added with pending
+        placeholder metadata instead of waiting for IGDB.
+        """
         # Check if already in collection for this platform
         statement = select(UserGame).where(
             UserGame.user_id == user_id,
@@ -64,7 +168,10 @@ class LibraryService:
             raise ValueError("Game already in collection for this platform")
 
         # Get or cache the game
-        game_cache = await self.get_or_cache_game(session, igdb_id)
+        if defer_metadata:
+            game_cache = self.get_or_queue_game(session, igdb_id)
+        else:
+            game_cache = await self.get_or_cache_game(session, igdb_id)
 
         # Create collection entry
         user_game = UserGame(
@@ -75,18 +182,42 @@ class LibraryService:
             platform_name=platform_name,
         )
         session.add(user_game)
+        session.flush()
+        self._record_change(session, user_game, "add")
+        stats_service.record(session, user_id, platform_igdb_id, added=1)
         session.commit()
         session.refresh(user_game)
         return user_game
 
+    def record_game_metadata_changes(self, session: Session, game_ids: list[int]) -> None:
+        """
+        Record that cached games' metadata changed for every library holding them.
+
+        Bumps library versions so ETags change, and logs a fresh add for each
+        entry so delta sync clients pick up the new details.
+        """
+        statement = (
+            select(UserGame)
+            .where(UserGame.game_id.in_(game_ids))
+            .order_by(UserGame.user_id)
+        )
+        for user_game in session.exec(statement).all():
+            self._record_change(session, user_game, "add", metadata_refresh=True)
+
     def get_library_games(
         self,
         session: Session,
         user_id: int,
         page: int = 1,
         page_size: int = 20,
+        game_fields: Optional[Iterable[str]] = None,
     ) -> tuple[list[UserGame], int]:
-        """Get paginated list of games in user's collection."""
+        """
+        Get paginated list of games in user's collection.
+
+        Only the GameCache columns named in ``game_fields`` are loaded;
+        None loads all of them.
+        """
         # Count total
         count_statement = select(UserGame).where(UserGame.user_id == user_id)
         total = len(session.exec(count_statement).all())
@@ -96,6 +227,7 @@ class LibraryService:
         statement = (
             select(UserGame)
             .where(UserGame.user_id == user_id)
+            .options(_game_load_options(game_fields))
             .offset(offset)
             .limit(page_size)
         )
@@ -103,11 +235,17 @@ class LibraryService:
         return list(games), total
 
     def get_library_games_by_igdb_id(
-        self, session: Session, user_id: int, igdb_id: int
+        self,
+        session: Session,
+        user_id: int,
+        igdb_id: int,
+        game_fields: Optional[Iterable[str]] = None,
     ) -> list[UserGame]:
         """Get all entries for a specific game in user's collection (one per platform)."""
-        statement = select(UserGame).where(
-            UserGame.user_id == user_id, UserGame.igdb_id == igdb_id
+        statement = (
+            select(UserGame)
+            .where(UserGame.user_id == user_id, UserGame.igdb_id == igdb_id)
+            .options(_game_load_options(game_fields))
         )
         return list(session.exec(statement).all())
 
@@ -125,9 +263,108 @@ class LibraryService:
             return False
 
         session.delete(user_game)
+        self._record_change(session, user_game, "remove")
+        stats_service.record(session, user_id, platform_igdb_id, removed=1)
         session.commit()
         return True
 
+    def get_library_changes(
+        self, session: Session, user_id: int, since: int, limit: int = 100
+    ) -> tuple[list[LibraryChange], dict[int, UserGame], bool]:
+        """
+        Get the user's library changes with a sequence number above ``since``.
+
+        Returns the changes, the still-present library entries for the adds
+        keyed by id, and whether more changes follow. Raises ValueError when
+        compaction has dropped changes after ``since``; ``since=0`` is always
+        served and replays the whole library as adds.
+        """
+        if since:
+            compacted_through = session.exec(
+                select(User.changes_compacted_through).where(User.id == user_id)
+            ).first() or 0
+            if since < compacted_through:
+                raise ValueError("Sync token expired")
+
+        statement = (
+            select(LibraryChange)
+            .where(LibraryChange.user_id == user_id, LibraryChange.id > since)
+            .order_by(LibraryChange.id)
+            .limit(limit + 1)
+        )
+        changes = list(session.exec(statement).all())
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        adds = [change for change in changes if change.action == "add"]
+        entries = {}
+        if adds:
+            statement = (
+                select(UserGame)
+                .where(
+                    UserGame.user_id == user_id,
+                    UserGame.id.in_([change.user_game_id for change in adds]),
+                )
+                .options(_game_load_options(None))
+            )
+            found = {user_game.id: user_game for user_game in session.exec(statement)}
+            # Only attach the entry the change was logged for
+            for change in adds:
+                user_game = found.get(change.user_game_id)
+                if (
+                    user_game is not None
+                    and user_game.igdb_id == change.igdb_id
+                    and user_game.platform_igdb_id == change.platform_igdb_id
+                ):
+                    entries[user_game.id] = user_game
+        return changes, entries, has_more
+
+    def compact_library_changes(self, session: Session, before: datetime) -> int:
+        """
+        Compact change log entries older than ``before``.
+
+        Entries superseded by a later change to the same game and platform
+        are deleted. Old removals are then dropped too, and each affected
+        user's ``changes_compacted_through`` is raised so that sync tokens
+        from before the dropped removal get a full resync instead. Adds that
+        are still current are kept, so ``since=0`` always replays the library.
+        Returns the number of deleted entries.
+        """
+        newer = aliased(LibraryChange)
+        superseded = (
+            select(newer.id)
+            .where(
+                newer.user_id == LibraryChange.user_id,
+                newer.igdb_id == LibraryChange.igdb_id,
+                newer.platform_igdb_id == LibraryChange.platform_igdb_id,
+                newer.id > LibraryChange.id,
+            )
+            .exists()
+        )
+        deleted = session.exec(
+            delete(LibraryChange).where(LibraryChange.changed_at < before, superseded)
+        ).rowcount
+
+        old_removals = (
+            select(LibraryChange.user_id, func.max(LibraryChange.id))
+            .where(LibraryChange.changed_at < before, LibraryChange.action == "remove")
+            .group_by(LibraryChange.user_id)
+        )
+        for user_id, last_id in session.exec(old_removals).all():
+            session.exec(
+                update(User)
+                .where(User.id == user_id, User.changes_compacted_through < last_id)
+                .values(changes_compacted_through=last_id)
+            )
+        deleted += session.exec(
+            delete(LibraryChange).where(
+                LibraryChange.changed_at < before, LibraryChange.action == "remove"
+            )
+        ).rowcount
+
+        session.commit()
+        return deleted
+
 
 # Singleton instance
 library_service = LibraryService()
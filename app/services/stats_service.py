@@ -0,0 +1,181 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, select
+
+from app.models.db import LibraryChange, LibraryDailyStats
+
+
+def period_start(day: date, granularity: str) -> date:
+    """First day of the day, ISO week or month containing ``day``."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+class StatsService:
+    def record(
+        self,
+        session: Session,
+        user_id: int,
+        platform_igdb_id: int,
+        added: int = 0,
+        removed: int = 0,
+    ) -> None:
+        """
+        Count a library add or removal in today's rollup (UTC).
+
+        Runs in the caller's transaction, after the library version bump has
+        locked the user's row, so concurrent changes can't both insert the row.
+        """
+        key = (
+            LibraryDailyStats.user_id == user_id,
+            LibraryDailyStats.day == datetime.utcnow().date(),
+            LibraryDailyStats.platform_igdb_id == platform_igdb_id,
+        )
+        updated = session.exec(
+            update(LibraryDailyStats)
+            .where(*key)
+            .values(
+                added=LibraryDailyStats.added + added,
+                removed=LibraryDailyStats.removed + removed,
+            )
+        ).rowcount
+        if not updated:
+            session.add(
+                LibraryDailyStats(
+                    user_id=user_id,
+                    day=datetime.utcnow().date(),
+                    platform_igdb_id=platform_igdb_id,
+                    added=added,
+                    removed=removed,
+                )
+            )
+
+    def rollup_days(self, session: Session, start: date, end: date) -> int:
+        """
+        Rebuild the rollups for ``start`` to ``end`` (inclusive) from the change log.
+
+        Idempotent, so the scheduled job can re-run a day to repair it. Adds
+        logged again for metadata refreshes are skipped, so each library
+        entry is counted once. The days must be within the change log
+        retention period. Returns the number of rollup rows written.
+        """
+        begin = datetime.combine(start, time.min)
+        finish = datetime.combine(end + timedelta(days=1), time.min)
+
+        changes = session.exec(
+            select(
+                LibraryChange.user_id,
+                LibraryChange.platform_igdb_id,
+                LibraryChange.action,
+                LibraryChange.changed_at,
+            ).where(
+                LibraryChange.changed_at >= begin,
+                LibraryChange.changed_at < finish,
+                LibraryChange.metadata_refresh.is_(False),
+            )
+        ).all()
+
+        counts: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+        for user_id, platform_igdb_id, action, changed_at in changes:
+            entry = counts[(user_id, changed_at.date(), platform_igdb_id)]
+            entry[0 if action == "add" else 1] += 1
+
+        session.exec(
+            delete(LibraryDailyStats).where(
+                LibraryDailyStats.day >= start, LibraryDailyStats.day <= end
+            )
+        )
+        for (user_id, day, platform_igdb_id), (added, removed) in counts.items():
+            session.add(
+                LibraryDailyStats(
+                    user_id=user_id,
+                    day=day,
+                    platform_igdb_id=platform_igdb_id,
+                    added=added,
+                    removed=removed,
+                )
+            )
+        session.commit()
+        return len(counts)
+
+    def get_history(
+        self,
+        session: Session,
+        user_id: int,
+        start: date,
+        end: date,
+        granularity: str = "day",
+        platform_ids: Optional[Iterable[int]] = None,
+    ) -> list[dict]:
+        """
+        Games added and removed per platform and period, with running totals.
+
+        Reads only the rollups: one aggregate for the totals before ``start``
+        and the rows inside the range. Every period of the range is returned
+        for each platform that has games or activity, so series have no gaps.
+        ``start`` is moved back to the beginning of its period.
+        """
+        start = period_start(start, granularity)
+        filters = [LibraryDailyStats.user_id == user_id]
+        if platform_ids:
+            filters.append(LibraryDailyStats.platform_igdb_id.in_(list(platform_ids)))
+
+        totals: dict[int, int] = defaultdict(int)
+        baseline = session.exec(
+            select(
+                LibraryDailyStats.platform_igdb_id,
+                func.sum(LibraryDailyStats.added - LibraryDailyStats.removed),
+            )
+            .where(*filters, LibraryDailyStats.day < start)
+            .group_by(LibraryDailyStats.platform_igdb_id)
+        ).all()
+        for platform_igdb_id, total in baseline:
+            totals[platform_igdb_id] = int(total or 0)
+
+        activity: dict[tuple[date, int], list[int]] = defaultdict(lambda: [0, 0])
+        rows = session.exec(
+            select(LibraryDailyStats)
+            .where(*filters, LibraryDailyStats.day >= start, LibraryDailyStats.day <= end)
+        ).all()
+        for row in rows:
+            entry = activity[(period_start(row.day, granularity), row.platform_igdb_id)]
+            entry[0] += row.added
+            entry[1] += row.removed
+
+        platforms = sorted(
+            {platform for platform, total in totals.items() if total}
+            | {platform for _, platform in activity}
+        )
+        buckets = []
+        current = period_start(start, granularity)
+        while current <= end:
+            for platform_igdb_id in platforms:
+                added, removed = activity.get((current, platform_igdb_id), (0, 0))
+                totals[platform_igdb_id] += added - removed
+                buckets.append({
+                    "period_start": current,
+                    "platform_igdb_id": platform_igdb_id,
+                    "added": added,
+                    "removed": removed,
+                    "total": totals[platform_igdb_id],
+                })
+            current = _next_period(current, granularity)
+        return buckets
+
+
+# Singleton instance
+stats_service = StatsService()
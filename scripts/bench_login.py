@@ -0,0 +1,86 @@
+"""Benchmark /auth/login throughput under concurrency.
+
+Runs the app in-process against a throwaway SQLite database and fires
+concurrent logins through an ASGI transport, so only hashing and request
+handling are measured (no network).
+
+Usage:
+    python scripts/bench_login.py --requests 200 --concurrency 32 --rounds 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Total logins to send")
+    parser.add_argument("--concurrency", type=int, default=32, help="Logins in flight at once")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost to benchmark")
+    parser.add_argument("--workers", type=int, default=4, help="Password hash worker threads")
+    return parser.parse_args()
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+    from app.main import app
+    from app.core.database import create_db_and_tables
+
+    create_db_and_tables()
+    transport = httpx.ASGITransport(app=app)
+    credentials = {"username": "bench", "password": "bench-password"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post(
+            "/auth/register", json={**credentials, "email": "bench@example.com"}
+        )
+        response.raise_for_status()
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies: list[float] = []
+        statuses: dict[int, int] = {}
+
+        async def login() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/auth/login", json=credentials)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"bcrypt rounds: {args.rounds}, workers: {args.workers}, concurrency: {args.concurrency}")
+    print(f"requests: {args.requests} in {elapsed:.2f}s -> {args.requests / elapsed:.1f} req/s")
+    print(
+        f"latency p50: {quantiles[49] * 1000:.1f}ms "
+        f"p95: {quantiles[94] * 1000:.1f}ms p99: {quantiles[98] * 1000:.1f}ms"
+    )
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+
+
+def main() -> None:
+    args = parse_args()
+    db_dir = tempfile.mkdtemp(prefix="backlogstats-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_dir}/bench.db"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(max(args.concurrency, 1))
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""CPU cost per request of response serialization.
+
+Runs the app in-process against a seeded SQLite database with IGDB search
+stubbed out to return synthetic games (see fake_igdb.py). Measures process
+CPU time per request for a 50-result search and a 100-row library page, with
+the standard response_model path and with FAST_SERIALIZATION, each with and
+without gzip/brotli compression.
+
+Usage:
+    python scripts/bench_serialization.py
+    python scripts/bench_serialization.py --requests 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+SEARCH_RESULTS = 50
+LIBRARY_PAGE = 100
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per measurement")
+    return parser.parse_args()
+
+
+def configure_environment() -> None:
+    directory = tempfile.mkdtemp(prefix="backlogstats-serialization-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{directory}/bench.db",
+        "IGDB_CLIENT_ID": "bench",
+        "IGDB_CLIENT_SECRET": "bench",
+        "RATE_LIMIT_ENABLED": "false",
+        "COMPRESSION_ENABLED": "true",
+        "SLOW_REQUEST_THRESHOLD_MS": "600000",
+    })
+
+
+def seed() -> str:
+    """Create a user with a library of LIBRARY_PAGE games; return an access token."""
+    from sqlmodel import Session
+
+    from app.core.auth import create_access_token
+    from app.core.database import create_db_and_tables, engine
+    from app.models.db import GameCache, User, UserGame
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        user = User(username="bench", email="bench@example.com", hashed_password="-")
+        session.add(user)
+        session.commit()
+        for igdb_id in range(1, LIBRARY_PAGE + 1):
+            game = GameCache(
+                igdb_id=igdb_id,
+                name=f"Synthetic Game {igdb_id}",
+                summary="Lorem ipsum dolor sit amet. " * 20,
+                cover_url=f"https://images.igdb.com/igdb/image/upload/t_720p/co{igdb_id:x}.jpg",
+            )
+            session.add(game)
+            session.flush()
+            session.add(UserGame(
+                user_id=user.id, game_id=game.id, igdb_id=igdb_id,
+                platform_igdb_id=6, platform_name="PC (Microsoft Windows)",
+            ))
+        session.commit()
+        return create_access_token(user.id)
+
+
+def stub_igdb_search() -> None:
+    from fake_igdb import make_game
+
+    from app.services.igdb_service import IGDBService, igdb_service
+
+    games = [make_game(game_id) for game_id in range(1, SEARCH_RESULTS + 1)]
+    for game in games:
+        IGDBService._add_cover_urls(game)
+
+    async def search_games_with_count(**kwargs):
+        # Fresh dicts each call, as IGDB responses would be
+        return [dict(game) for game in games], 1000
+
+    igdb_service.search_games_with_count = search_games_with_count
+
+
+async def measure(client, url: str, headers: dict, requests: int) -> tuple[float, int]:
+    """Return CPU milliseconds per request and the size sent on the wire."""
+    response = await client.get(url, headers=headers)
+    response.raise_for_status()
+    started = time.process_time()
+    for _ in range(requests):
+        await client.get(url, headers=headers)
+    return (time.process_time() - started) / requests * 1000, int(response.headers["content-length"])
+
+
+async def run(args: argparse.Namespace, token: str) -> None:
+    import httpx
+
+    from app.core.config import get_settings
+    from app.main import app
+
+    settings = get_settings()
+    scenarios = [
+        ("search", f"/games/search?q=game&limit={SEARCH_RESULTS}", {}),
+        ("library", f"/library/games?page_size={LIBRARY_PAGE}", {"Authorization": f"Bearer {token}"}),
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'scenario':<9} {'path':<9} {'encoding':<9} {'cpu ms/req':>10} {'bytes':>8}")
+        for name, url, headers in scenarios:
+            for fast in (False, True):
+                settings.fast_serialization = fast
+                for encoding in ("identity", "gzip, br"):
+                    cpu_ms, size = await measure(
+                        client, url, {**headers, "Accept-Encoding": encoding}, args.requests
+                    )
+                    path = "fast" if fast else "standard"
+                    print(f"{name:<9} {path:<9} {encoding.split(',')[0]:<9} {cpu_ms:>10.2f} {size:>8}")
+
+
+def main() -> None:
+    args = parse_args()
+    configure_environment()
+    token = seed()
+    stub_igdb_search()
+    asyncio.run(run(args, token))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark concurrent SQLite reads while writes are in progress.
+
+Runs the library listing query from reader threads while writer threads
+keep inserting library entries, once per SQLite profile ("development":
+one shared connection, "production": pooled WAL connections), and reports
+read/write throughput, read latency and errors.
+
+Usage:
+    python scripts/bench_sqlite.py --duration 5 --readers 4 --writers 2
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5, help="Seconds per profile")
+    parser.add_argument("--readers", type=int, default=4, help="Reader threads")
+    parser.add_argument("--writers", type=int, default=2, help="Writer threads")
+    parser.add_argument("--library-size", type=int, default=500, help="Entries in the listed library")
+    parser.add_argument("--profiles", default="development,production", help="SQLite profiles to compare")
+    return parser.parse_args()
+
+
+def seed(engine, library_size: int) -> None:
+    from sqlmodel import Session, SQLModel
+
+    from app.models.db import GameCache, User, UserGame
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            User(id=1, username="reader", email="reader@example.com", hashed_password="x"),
+            User(id=2, username="writer", email="writer@example.com", hashed_password="x"),
+        ])
+        session.add_all([
+            GameCache(id=i, igdb_id=i, name=f"Game {i}", summary="Lorem ipsum. " * 50)
+            for i in range(1, library_size + 1)
+        ])
+        session.add_all([
+            UserGame(user_id=1, game_id=i, igdb_id=i, platform_igdb_id=6, platform_name="PC")
+            for i in range(1, library_size + 1)
+        ])
+        session.commit()
+
+
+def run_profile(profile: str, args: argparse.Namespace) -> dict:
+    from sqlmodel import Session
+
+    from app.core.database import create_app_engine
+    from app.models.db import UserGame
+    from app.services.library_service import library_service
+
+    database_url = f"sqlite:///{tempfile.mkdtemp(prefix='backlogstats-bench-')}/bench.db"
+    engine = create_app_engine(database_url, sqlite_mode=profile)
+    seed(engine, args.library_size)
+
+    stop = threading.Event()
+    read_latencies: list[float] = []
+    counts = {"writes": 0, "errors": 0}
+    lock = threading.Lock()
+    next_id = iter(range(10**9))
+
+    def reader() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with Session(engine) as session:
+                    library_service.get_library_games(session, user_id=1, page=1, page_size=100)
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+                continue
+            with lock:
+                read_latencies.append(time.perf_counter() - started)
+
+    def writer() -> None:
+        while not stop.is_set():
+            with lock:
+                platform_id = next(next_id)
+            try:
+                with Session(engine) as session:
+                    session.add(UserGame(
+                        user_id=2, game_id=1, igdb_id=1,
+                        platform_igdb_id=platform_id, platform_name="Bench",
+                    ))
+                    session.commit()
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+                continue
+            with lock:
+                counts["writes"] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    quantiles = statistics.quantiles(read_latencies, n=100) if len(read_latencies) > 1 else [0] * 99
+    return {
+        "reads_per_second": len(read_latencies) / args.duration,
+        "writes_per_second": counts["writes"] / args.duration,
+        "read_p50_ms": quantiles[49] * 1000,
+        "read_p95_ms": quantiles[94] * 1000,
+        "errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    print(f"{args.readers} readers, {args.writers} writers, {args.duration}s per profile")
+    print(f"{'profile':<12} {'reads/s':>8} {'writes/s':>9} {'read p50':>9} {'read p95':>9} {'errors':>7}")
+    for profile in args.profiles.split(","):
+        stats = run_profile(profile, args)
+        print(
+            f"{profile:<12} {stats['reads_per_second']:>8.1f} {stats['writes_per_second']:>9.1f} "
+            f"{stats['read_p50_ms']:>7.1f}ms {stats['read_p95_ms']:>7.1f}ms {stats['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Cold start benchmark for the API.
+
+Starts fresh interpreters that import app.main and run the application
+lifespan startup, the work a new uvicorn worker does before it can serve.
+Reports the median import and startup times and fails when they exceed the
+budgets, or when modules meant to be imported lazily are loaded at startup.
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --mode development --runs 10
+    python scripts/bench_startup.py --import-budget-ms 800 --startup-budget-ms 50
+
+Exits with status 1 when a budget is exceeded.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Loaded on first use by auth, IGDB and cover code, never at startup
+DEFERRED_MODULES = ["bcrypt", "httpx", "jose"]
+
+# Runs in the child interpreter and prints its measurements as JSON
+CHILD = """
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def start():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "deferred_loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["production", "development"], default="production",
+                        help="STARTUP_MODE to benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--import-budget-ms", type=float, default=1500, help="Median import time budget")
+    parser.add_argument("--startup-budget-ms", type=float, default=100, help="Median lifespan startup budget")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    database_url = f"sqlite:///{tempfile.mkdtemp(prefix='backlogstats-startup-')}/startup.db"
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "STARTUP_MODE": args.mode,
+        "IGDB_CLIENT_ID": "bench",
+        "IGDB_CLIENT_SECRET": "bench",
+    }
+    if args.mode == "production":
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            env=env, cwd=PROJECT_ROOT, check=True, capture_output=True,
+        )
+
+    runs = []
+    for _ in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD % DEFERRED_MODULES],
+            env=env, cwd=PROJECT_ROOT, check=True, capture_output=True, text=True,
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+    startup_ms = statistics.median(run["startup_ms"] for run in runs)
+    deferred_loaded = sorted({name for run in runs for name in run["deferred_loaded"]})
+
+    print(f"mode:    {args.mode} ({args.runs} runs)")
+    print(f"import:  {import_ms:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"startup: {startup_ms:.1f} ms (budget {args.startup_budget_ms:.0f} ms)")
+
+    problems = []
+    if import_ms > args.import_budget_ms:
+        problems.append("import time over budget")
+    if startup_ms > args.startup_budget_ms:
+        problems.append("startup time over budget")
+    if deferred_loaded:
+        problems.append(f"imported at startup: {', '.join(deferred_loaded)}")
+    if problems:
+        print(f"FAILED: {'; '.join(problems)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Load and latency benchmark suite.
+
+Boots the app with uvicorn against a local fake IGDB/Twitch server
+(scripts/fake_igdb.py), seeds SQLite or Postgres with synthetic users and
+libraries, then drives the auth, search, detail, add and list endpoints
+concurrently. Reports throughput, p50/p95/p99 latency and DB queries per
+request (from the Server-Timing header), and compares them against a
+stored baseline.
+
+Usage:
+    python scripts/bench_suite.py --users 50 --library-size 200 --requests 500 --concurrency 32
+    python scripts/bench_suite.py --save-baseline
+    python scripts/bench_suite.py --database-url postgresql://localhost/bench --reset
+
+Exits with status 1 when a scenario regresses beyond --tolerance, or when
+there is no baseline to compare against and --save-baseline is not given.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_BASELINE = PROJECT_ROOT / "scripts" / "bench_baseline.json"
+SCENARIOS = ["auth", "search", "detail", "add", "list"]
+PASSWORD = "bench-password"
+
+_DB_TIMING_RE = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Database to seed (default: temporary SQLite file)")
+    parser.add_argument("--reset", action="store_true", help="Drop existing tables before seeding")
+    parser.add_argument("--users", type=int, default=20, help="Synthetic users to create")
+    parser.add_argument("--library-size", type=int, default=100, help="Library entries per user")
+    parser.add_argument("--games", type=int, default=2000, help="Games in the seeded games_cache")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios to run")
+    parser.add_argument("--igdb-latency-ms", type=float, default=50, help="Mean fake IGDB latency")
+    parser.add_argument("--igdb-error-rate", type=float, default=0, help="Fraction of fake IGDB 500s")
+    parser.add_argument("--igdb-rate-limit", type=float, default=0, help="Fake IGDB requests/second (0 = off)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready in {timeout}s")
+
+
+def seed(database_url: str, args: argparse.Namespace) -> None:
+    """Create the schema and insert synthetic users, games and libraries."""
+    import bcrypt
+    from sqlalchemy import func, insert
+    from sqlmodel import Session, SQLModel, create_engine, select
+
+    from app.models.db import GameCache, User, UserGame
+
+    engine = create_engine(database_url)
+    if args.reset:
+        SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        if session.exec(select(func.count()).select_from(User)).one():
+            raise SystemExit("Database already has users; pass --reset to reseed it")
+
+        hashed = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+        session.execute(insert(User), [
+            {"username": f"bench{i}", "email": f"bench{i}@example.com", "hashed_password": hashed}
+            for i in range(args.users)
+        ])
+        session.execute(insert(GameCache), [
+            {"igdb_id": i, "name": f"Synthetic Game {i}", "summary": "Lorem ipsum dolor sit amet. " * 20,
+             "cover_url": f"https://images.igdb.com/igdb/image/upload/t_720p/co{i:x}.jpg"}
+            for i in range(1, args.games + 1)
+        ])
+        session.commit()
+
+        user_ids = session.exec(select(User.id)).all()
+        game_ids = dict(session.exec(select(GameCache.igdb_id, GameCache.id)).all())
+        rng = random.Random(0)
+        platforms = [(6, "PC (Microsoft Windows)"), (130, "Nintendo Switch"), (167, "PlayStation 5")]
+        rows = []
+        for user_id in user_ids:
+            entries = rng.sample(
+                [(igdb_id, platform) for igdb_id in game_ids for platform in platforms],
+                min(args.library_size, len(game_ids) * len(platforms)),
+            )
+            for igdb_id, (platform_id, platform_name) in entries:
+                rows.append({
+                    "user_id": user_id, "game_id": game_ids[igdb_id], "igdb_id": igdb_id,
+                    "platform_igdb_id": platform_id, "platform_name": platform_name,
+                })
+        if rows:
+            session.execute(insert(UserGame), rows)
+        session.commit()
+    engine.dispose()
+
+
+async def run_scenario(client, name: str, args: argparse.Namespace, tokens: list[str]) -> dict:
+    """Drive one scenario and return its latency, throughput and query stats."""
+    rng = random.Random(name)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    queries: list[int] = []
+    statuses: dict[str, int] = {}
+
+    def make_request(i: int):
+        headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+        if name == "auth":
+            return client.post("/auth/login", json={"username": f"bench{i % args.users}", "password": PASSWORD})
+        if name == "search":
+            return client.get("/games/search", params={"q": f"game {rng.randrange(500)}", "limit": 20})
+        if name == "detail":
+            return client.get(f"/games/{rng.randrange(1, args.games + 1)}")
+        if name == "add":
+            # Games outside the seeded cache, so each add fetches from IGDB
+            return client.post("/library/games", headers=headers, json={
+                "igdb_id": args.games + i + 1, "platform_igdb_id": 130, "platform_name": "Nintendo Switch",
+            })
+        if name == "list":
+            return client.get("/library/games", headers=headers, params={"page": rng.randint(1, 3), "page_size": 50})
+        raise ValueError(f"Unknown scenario {name}")
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            match = _DB_TIMING_RE.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "throughput": args.requests / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "queries_per_request": statistics.mean(queries) if queries else 0,
+        "statuses": statuses,
+    }
+
+
+async def run_benchmarks(base_url: str, args: argparse.Namespace) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        tokens = []
+        for i in range(args.users):
+            response = await client.post("/auth/login", json={"username": f"bench{i}", "password": PASSWORD})
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+
+        results = {}
+        for name in args.scenarios.split(","):
+            results[name] = await run_scenario(client, name, args, tokens)
+        return results
+
+
+def report(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print a results table; return True if any scenario regressed."""
+    regressed = False
+    print(f"{'scenario':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}  statuses")
+    for name, stats in results.items():
+        print(
+            f"{name:<8} {stats['throughput']:>8.1f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+            f"{stats['p99_ms']:>8.1f} {stats['queries_per_request']:>8.1f}  {stats['statuses']}"
+        )
+        base = baseline.get(name)
+        if not base:
+            continue
+        problems = []
+        if stats["throughput"] < base["throughput"] * (1 - tolerance):
+            problems.append(f"throughput {base['throughput']:.1f} -> {stats['throughput']:.1f} req/s")
+        if stats["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"p95 {base['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms")
+        if stats["queries_per_request"] > base["queries_per_request"]:
+            problems.append(
+                f"queries {base['queries_per_request']:.1f} -> {stats['queries_per_request']:.1f} per request"
+            )
+        if problems:
+            regressed = True
+            print(f"  REGRESSION vs baseline: {'; '.join(problems)}")
+    return regressed
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.save_baseline and not args.baseline.exists():
+        # Without a baseline every comparison would be skipped and the gate could never fail
+        raise SystemExit(f"No baseline at {args.baseline}; run with --save-baseline first")
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='backlogstats-bench-')}/bench.db"
+
+    print(f"Seeding {database_url} ({args.users} users x {args.library_size} games)...")
+    seed(database_url, args)
+
+    igdb_port, app_port = free_port(), free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "IGDB_CLIENT_ID": "bench",
+        "IGDB_CLIENT_SECRET": "bench",
+        "IGDB_BASE_URL": f"http://127.0.0.1:{igdb_port}/v4",
+        "TWITCH_AUTH_URL": f"http://127.0.0.1:{igdb_port}/oauth2/token",
+        "BCRYPT_ROUNDS": "4",
+        "RATE_LIMIT_ENABLED": "false",
+        "SLOW_REQUEST_THRESHOLD_MS": "600000",
+    }
+    processes = [
+        subprocess.Popen([
+            sys.executable, str(PROJECT_ROOT / "scripts" / "fake_igdb.py"), "--port", str(igdb_port),
+            "--latency-ms", str(args.igdb_latency_ms), "--error-rate", str(args.igdb_error_rate),
+            "--rate-limit", str(args.igdb_rate_limit),
+        ], env=env),
+        subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port), "--log-level", "warning",
+        ], env=env, cwd=PROJECT_ROOT),
+    ]
+    try:
+        wait_until_ready(f"http://127.0.0.1:{igdb_port}/docs", processes[0])
+        wait_until_ready(f"http://127.0.0.1:{app_port}/", processes[1])
+        results = asyncio.run(run_benchmarks(f"http://127.0.0.1:{app_port}", args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressed = report(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compact the library change log used by GET /library/changes.
+
+Deletes entries superseded by a later change to the same game and platform,
+and removals older than the retention period. Run it periodically, e.g.
+daily from cron.
+
+Usage:
+    python scripts/compact_library_changes.py
+    python scripts/compact_library_changes.py --days 7
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def main() -> None:
+    from sqlmodel import Session
+
+    from app.core.config import get_settings
+    from app.core.database import engine
+    from app.services.library_service import library_service
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=get_settings().library_change_retention_days,
+        help="Compact entries older than this many days",
+    )
+    args = parser.parse_args()
+
+    before = datetime.utcnow() - timedelta(days=args.days)
+    with Session(engine) as session:
+        deleted = library_service.compact_library_changes(session, before)
+    print(f"Deleted {deleted} change log entries older than {before:%Y-%m-%d %H:%M}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Local stand-in for the IGDB and Twitch OAuth APIs.
+
+Serves deterministic synthetic games for the endpoints IGDBService uses
+(/oauth2/token, /v4/games, /v4/multiquery) with configurable latency, error
+rate and a requests-per-second limit like IGDB's.
+
+Usage:
+    python scripts/fake_igdb.py --port 9000 --latency-ms 80 --error-rate 0.01 --rate-limit 4
+
+Then point the app at it:
+    IGDB_BASE_URL=http://127.0.0.1:9000/v4 TWITCH_AUTH_URL=http://127.0.0.1:9000/oauth2/token
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PLATFORMS = [(6, "PC (Microsoft Windows)"), (48, "PlayStation 4"), (130, "Nintendo Switch"), (167, "PlayStation 5")]
+GENRES = [(5, "Shooter"), (12, "Role-playing (RPG)"), (31, "Adventure"), (32, "Indie")]
+
+
+def make_game(game_id: int) -> dict:
+    """Build a deterministic synthetic game with every field IGDBService may request."""
+    rng = random.Random(game_id)
+    release = 946684800 + rng.randrange(0, 25 * 365) * 86400
+    platforms = rng.sample(PLATFORMS, rng.randint(1, 3))
+    return {
+        "id": game_id,
+        "name": f"Synthetic Game {game_id}",
+        "summary": "Lorem ipsum dolor sit amet. " * rng.randint(5, 40),
+        "storyline": "Once upon a time. " * rng.randint(0, 20),
+        "first_release_date": release,
+        "platforms": [{"id": pid, "name": name} for pid, name in platforms],
+        "release_dates": [
+            {"id": game_id * 10 + i, "date": release, "human": time.strftime("%b %d, %Y", time.gmtime(release)),
+             "platform": {"id": pid, "name": name}}
+            for i, (pid, name) in enumerate(platforms)
+        ],
+        "cover": {"id": game_id, "image_id": f"co{game_id:x}"},
+        "genres": [{"id": gid, "name": name} for gid, name in rng.sample(GENRES, 2)],
+        "involved_companies": [
+            {"id": game_id, "company": {"id": game_id % 97, "name": f"Studio {game_id % 97}"},
+             "developer": True, "publisher": False},
+        ],
+        "rating": rng.uniform(40, 95),
+        "aggregated_rating": rng.uniform(40, 95),
+    }
+
+
+def _clause(body: str, keyword: str) -> str:
+    match = re.search(rf"(?m)^\s*{keyword}\s+(.*?);", body)
+    return match.group(1) if match else ""
+
+
+def run_query(body: str, catalog_size: int, count: bool = False):
+    """Answer an APIcalypse query body against the synthetic catalog."""
+    where = _clause(body, "where")
+    id_match = re.search(r"\bid = \(?([\d,]+)\)?", where)
+    if id_match:
+        requested = [int(game_id) for game_id in id_match.group(1).split(",")]
+        ids = [game_id for game_id in requested if 0 < game_id <= catalog_size]
+    else:
+        # Searches match a deterministic slice of the catalog
+        term = _clause(body, "search").strip('"')
+        total = min(catalog_size, 50 + len(term) * 7)
+        start = sum(map(ord, term)) % max(catalog_size - total, 1)
+        ids = list(range(start + 1, start + total + 1))
+
+    if count:
+        return {"count": len(ids)}
+
+    offset = int(_clause(body, "offset") or 0)
+    limit = int(_clause(body, "limit") or 10)
+    return [make_game(game_id) for game_id in ids[offset:offset + limit]]
+
+
+def create_app(
+    latency_ms: float = 0,
+    error_rate: float = 0,
+    rate_limit: float = 0,
+    catalog_size: int = 100_000,
+) -> FastAPI:
+    app = FastAPI(title="Fake IGDB")
+    window = {"second": 0, "count": 0}
+
+    @app.middleware("http")
+    async def simulate_upstream(request: Request, call_next):
+        if rate_limit:
+            second = int(time.monotonic())
+            if window["second"] != second:
+                window.update(second=second, count=0)
+            window["count"] += 1
+            if window["count"] > rate_limit:
+                return JSONResponse({"message": "Too Many Requests"}, status_code=429)
+        if latency_ms:
+            await asyncio.sleep(random.expovariate(1 / latency_ms) / 1000)
+        if error_rate and random.random() < error_rate:
+            return JSONResponse({"message": "Internal Server Error"}, status_code=500)
+        return await call_next(request)
+
+    @app.post("/oauth2/token")
+    async def token():
+        return {"access_token": "fake-token", "expires_in": 5_000_000, "token_type": "bearer"}
+
+    @app.post("/v4/games")
+    async def games(request: Request):
+        return run_query((await request.body()).decode(), catalog_size)
+
+    @app.post("/v4/multiquery")
+    async def multiquery(request: Request):
+        body = (await request.body()).decode()
+        results = []
+        for endpoint, name, query in re.findall(r'query (\S+) "([^"]+)" \{(.*?)\};', body, re.S):
+            if endpoint.endswith("/count"):
+                results.append({"name": name, **run_query(query, catalog_size, count=True)})
+            else:
+                results.append({"name": name, "result": run_query(query, catalog_size)})
+        return results
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Mean added latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of 500 responses")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requests per second before 429 (0 = off)")
+    parser.add_argument("--catalog-size", type=int, default=100_000, help="Number of synthetic games")
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.error_rate, args.rate_limit, args.catalog_size)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
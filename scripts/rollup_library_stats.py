@@ -0,0 +1,49 @@
+"""Rebuild daily library stats rollups from the library change log.
+
+Add and remove requests update today's rollups as they happen. This job
+recomputes whole days from the change log, so rows are exact even when
+changes bypassed the API. Run it daily after midnight UTC; by default it
+rebuilds yesterday. Days older than the change log retention can't be
+rebuilt because compaction has dropped their entries.
+
+Usage:
+    python scripts/rollup_library_stats.py
+    python scripts/rollup_library_stats.py --start 2026-10-01 --end 2026-10-18
+"""
+
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def main() -> None:
+    from sqlmodel import Session
+
+    from app.core.config import get_settings
+    from app.core.database import engine
+    from app.services.stats_service import stats_service
+
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=date.fromisoformat, default=yesterday, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last day, default --start")
+    args = parser.parse_args()
+    end = args.end or args.start
+
+    oldest = datetime.utcnow().date() - timedelta(days=get_settings().library_change_retention_days)
+    if args.start < oldest:
+        parser.error(f"--start is before {oldest}, beyond the change log retention period")
+    if end < args.start:
+        parser.error("--end must not be before --start")
+
+    with Session(engine) as session:
+        rows = stats_service.rollup_days(session, args.start, end)
+    print(f"Rebuilt {rows} rollup rows for {args.start} to {end}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+# Keep the app's module-level engine off the development database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from sqlmodel import Session, SQLModel, create_engine  # noqa: E402
+
+from app.models.db import GameCache, User  # noqa: E402
+
+
+@pytest.fixture
+def session():
+    """An in-memory database with two users and two cached games."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            User(id=1, username="alice", email="alice@example.com", hashed_password="x"),
+            User(id=2, username="bob", email="bob@example.com", hashed_password="x"),
+            GameCache(igdb_id=100, name="Game 100"),
+            GameCache(igdb_id=200, name="Game 200"),
+        ])
+        session.commit()
+        yield session
+    engine.dispose()
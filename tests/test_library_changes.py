@@ -0,0 +1,51 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.services.library_service import library_service
+
+
+def add(session: Session, user_id: int, igdb_id: int, platform_igdb_id: int = 130):
+    return asyncio.run(library_service.add_game_to_library(
+        session=session,
+        user_id=user_id,
+        igdb_id=igdb_id,
+        platform_igdb_id=platform_igdb_id,
+        platform_name=f"Platform {platform_igdb_id}",
+    ))
+
+
+def remove(session: Session, user_id: int, igdb_id: int, platform_igdb_id: int = 130):
+    return library_service.remove_from_library(session, user_id, igdb_id, platform_igdb_id)
+
+
+def test_sync_token_keeps_increasing_after_compaction(session):
+    add(session, 1, 100)
+    remove(session, 1, 100)
+    changes, _, _ = library_service.get_library_changes(session, 1, since=0)
+    token = changes[-1].id
+
+    # Drops both entries, emptying the log
+    assert library_service.compact_library_changes(
+        session, datetime.utcnow() + timedelta(seconds=1)
+    ) == 2
+
+    add(session, 1, 200)
+    changes, _, _ = library_service.get_library_changes(session, 1, since=token)
+    assert [(change.action, change.igdb_id) for change in changes] == [("add", 200)]
+    assert changes[0].id > token
+
+
+def test_changes_only_carry_the_users_own_entries(session):
+    add(session, 1, 100)
+    remove(session, 1, 100)
+    bob_game = add(session, 2, 200, platform_igdb_id=48)
+
+    changes, entries, _ = library_service.get_library_changes(session, 1, since=0)
+    assert [change.action for change in changes] == ["add", "remove"]
+    assert changes[0].user_game_id != bob_game.id
+    assert entries == {}
+
+    changes, entries, _ = library_service.get_library_changes(session, 2, since=0)
+    assert list(entries) == [bob_game.id]
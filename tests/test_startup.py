@@ -0,0 +1,61 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Same budgets as scripts/bench_startup.py
+IMPORT_BUDGET_MS = 1500
+STARTUP_BUDGET_MS = 100
+RUNS = 3
+
+# Heavy dependencies that must only be imported on first use
+DEFERRED_MODULES = ["bcrypt", "httpx", "jose"]
+
+CHILD = """
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def start():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def test_cold_start_within_budget_and_defers_heavy_imports(tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path}/startup.db",
+        "STARTUP_MODE": "production",
+        "IGDB_CLIENT_ID": "test",
+        "IGDB_CLIENT_SECRET": "test",
+    }
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        env=env, cwd=PROJECT_ROOT, check=True, capture_output=True,
+    )
+
+    runs = []
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD % DEFERRED_MODULES],
+            env=env, cwd=PROJECT_ROOT, check=True, capture_output=True, text=True,
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    assert all(run["loaded"] == [] for run in runs), runs
+    assert statistics.median(run["import_ms"] for run in runs) <= IMPORT_BUDGET_MS
+    assert statistics.median(run["startup_ms"] for run in runs) <= STARTUP_BUDGET_MS
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.models.db import GameCache, LibraryChange, LibraryDailyStats
+from app.services.library_service import library_service
+from app.services.stats_service import stats_service
+
+
+def test_rollup_skips_metadata_refresh_after_original_add_is_compacted(session):
+    asyncio.run(library_service.add_game_to_library(
+        session=session, user_id=1, igdb_id=100, platform_igdb_id=130, platform_name="Switch",
+    ))
+    long_ago = datetime.utcnow() - timedelta(days=40)
+    session.exec(update(LibraryChange).values(changed_at=long_ago))
+    session.commit()
+
+    game_id = session.exec(select(GameCache.id).where(GameCache.igdb_id == 100)).one()
+    library_service.record_game_metadata_changes(session, [game_id])
+    session.commit()
+    # The refresh supersedes the original add, which compaction then drops
+    assert library_service.compact_library_changes(
+        session, datetime.utcnow() - timedelta(days=30)
+    ) == 1
+
+    today = datetime.utcnow().date()
+    assert stats_service.rollup_days(session, today, today) == 0
+    assert session.exec(select(LibraryDailyStats).where(LibraryDailyStats.day == today)).all() == []
+
+
+def test_rollup_counts_each_users_adds_and_removals(session):
+    for user_id, igdb_id in [(1, 100), (2, 100), (2, 200)]:
+        asyncio.run(library_service.add_game_to_library(
+            session=session, user_id=user_id, igdb_id=igdb_id, platform_igdb_id=130, platform_name="Switch",
+        ))
+    library_service.remove_from_library(session, 1, 100, 130)
+
+    today = datetime.utcnow().date()
+    stats_service.rollup_days(session, today, today)
+    rows = session.exec(select(LibraryDailyStats).order_by(LibraryDailyStats.user_id)).all()
+    assert [(row.user_id, row.added, row.removed) for row in rows] == [(1, 1, 1), (2, 2, 0)]